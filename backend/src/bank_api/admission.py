@@ -0,0 +1,138 @@
+import threading
+import time
+from typing import Optional
+
+from flask import Flask, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from bank_api.config import env_float, env_int
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+# probes must answer while the API is overloaded, streams would hold a slot for their whole lifetime
+EXEMPT_ENDPOINTS = {"healthz", "readyz", "stream_changes", "static"}
+QUERY_CANCELED = "57014"
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a bounded wait queue.
+    `acquire` fails immediately when the queue is full and after `queue_timeout` seconds of waiting.
+    """
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> bool:
+        with self._condition:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue_size:
+                return False
+
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + self.queue_timeout
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+def route_class() -> str:
+    return "read" if request.method in READ_METHODS else "write"
+
+def overloaded(app: Flask, message: str):
+    response = jsonify({"error": message})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(app.config["ADMISSION_RETRY_AFTER"])
+    return response
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session, transaction, connection):
+    """
+    Bound every statement of the transaction with `SET LOCAL statement_timeout`.
+    The timeout comes from the session's info (background writers) or from the current request.
+    """
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms is None and has_request_context():
+        timeout_ms = g.get("statement_timeout_ms")
+    if timeout_ms and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+def init_admission(app: Flask):
+    """
+    Limit concurrent reads and writes separately and shed load with 503 + Retry-After.
+
+    ADMISSION_READ_LIMIT / ADMISSION_WRITE_LIMIT requests of each class run at once (0 disables
+    the limit), up to ADMISSION_QUEUE_SIZE more wait at most ADMISSION_QUEUE_TIMEOUT seconds.
+    READ_STATEMENT_TIMEOUT_MS / WRITE_STATEMENT_TIMEOUT_MS bound each statement on PostgreSQL.
+    """
+    app.config.setdefault("ADMISSION_READ_LIMIT", env_int("ADMISSION_READ_LIMIT", 0))
+    app.config.setdefault("ADMISSION_WRITE_LIMIT", env_int("ADMISSION_WRITE_LIMIT", 0))
+    app.config.setdefault("ADMISSION_QUEUE_SIZE", env_int("ADMISSION_QUEUE_SIZE", 16))
+    app.config.setdefault("ADMISSION_QUEUE_TIMEOUT", env_float("ADMISSION_QUEUE_TIMEOUT", 1.0))
+    app.config.setdefault("ADMISSION_RETRY_AFTER", env_int("ADMISSION_RETRY_AFTER", 1))
+    app.config.setdefault("READ_STATEMENT_TIMEOUT_MS", env_int("READ_STATEMENT_TIMEOUT_MS", 0))
+    app.config.setdefault("WRITE_STATEMENT_TIMEOUT_MS", env_int("WRITE_STATEMENT_TIMEOUT_MS", 0))
+
+    limiters = app.extensions["admission_limiters"] = {}
+    limiters_lock = threading.Lock()
+
+    def get_limiter(kind: str) -> Optional[AdmissionLimiter]:
+        """Return the limiter of a route class, rebuilt when its settings change."""
+        limit = app.config[f"ADMISSION_{kind.upper()}_LIMIT"]
+        if limit <= 0:
+            return None
+        with limiters_lock:
+            settings = (limit, app.config["ADMISSION_QUEUE_SIZE"], app.config["ADMISSION_QUEUE_TIMEOUT"])
+            limiter = limiters.get(kind)
+            if limiter is None or (limiter.limit, limiter.queue_size, limiter.queue_timeout) != settings:
+                limiter = limiters[kind] = AdmissionLimiter(*settings)
+            return limiter
+
+    @app.before_request
+    def _admit_request():
+        if request.endpoint in EXEMPT_ENDPOINTS:
+            return
+
+        kind = route_class()
+        g.statement_timeout_ms = app.config[f"{kind.upper()}_STATEMENT_TIMEOUT_MS"]
+
+        limiter = get_limiter(kind)
+        if limiter is None:
+            return
+        if not limiter.acquire():
+            return overloaded(app, "Server is overloaded, retry later")
+        g._admission_limiter = limiter
+
+    @app.teardown_request
+    def _release_request(exc):
+        limiter = g.pop("_admission_limiter", None)
+        if limiter is not None:
+            limiter.release()
+
+    @app.errorhandler(PoolTimeoutError)
+    def _pool_exhausted(e):
+        return overloaded(app, "No database connection available, retry later")
+
+    @app.errorhandler(OperationalError)
+    def _statement_timeout(e):
+        if getattr(e.orig, "pgcode", None) != QUERY_CANCELED:
+            raise e
+        return overloaded(app, "Database query timed out, retry later")
@@ -0,0 +1,79 @@
+from typing import List, Optional
+
+from sqlalchemy import insert, select, update
+
+from bank_api.models import Change, ChangeVersion, Country
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+def bank_change(operation: str, swift_code: str, countryISO2: str,
+                address: Optional[str] = None, bank_name: Optional[str] = None) -> dict:
+    return {
+        "operation": operation,
+        "swiftCode": swift_code,
+        "countryISO2": countryISO2,
+        "address": address,
+        "bank_name": bank_name,
+    }
+
+def record_changes(session, changes: List[dict], batch_size: int = 5000) -> Optional[int]:
+    """
+    Append `changes` to the change log in the session's transaction.
+
+    Versions are reserved by bumping the single-row counter, which keeps the row
+    locked until commit, so versions become visible in order and a consumer
+    reading `since` its last version never skips a change.
+    Returns the last version, or None when there was nothing to record.
+    """
+    if not changes:
+        return None
+
+    last_version = session.execute(
+        update(ChangeVersion)
+        .where(ChangeVersion.id == 1)
+        .values(version=ChangeVersion.version + len(changes))
+        .returning(ChangeVersion.version)
+    ).scalar_one()
+    first_version = last_version - len(changes) + 1
+
+    rows = [dict(change, version=first_version + i) for i, change in enumerate(changes)]
+    for start in range(0, len(rows), batch_size):
+        session.execute(insert(Change), rows[start:start + batch_size])
+    return last_version
+
+def current_version(session) -> int:
+    return session.execute(
+        select(ChangeVersion.version).where(ChangeVersion.id == 1)
+    ).scalar_one_or_none() or 0
+
+def changes_since(session, since: int, limit: int) -> List[dict]:
+    """Return up to `limit` changes newer than `since`, oldest first, in the API format."""
+    rows = session.execute(
+        select(Change, Country.country_name)
+        .outerjoin(Country, Country.countryISO2 == Change.countryISO2)
+        .where(Change.version > since)
+        .order_by(Change.version)
+        .limit(limit)
+    ).all()
+
+    changes = []
+    for change, country_name in rows:
+        bank = None
+        if change.operation == UPSERT:
+            bank = {
+                "address": change.address,
+                "bankName": change.bank_name,
+                "countryISO2": change.countryISO2,
+                "countryName": country_name,
+                "isHeadquarter": change.swiftCode.endswith("XXX"),
+                "swiftCode": change.swiftCode,
+            }
+        changes.append({
+            "version": change.version,
+            "operation": change.operation,
+            "swiftCode": change.swiftCode,
+            "countryISO2": change.countryISO2,
+            "bank": bank,
+        })
+    return changes
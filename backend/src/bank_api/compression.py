@@ -0,0 +1,141 @@
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, Response, current_app, request
+
+from bank_api.config import env_int
+from bank_api.signals import directory_changed
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, responses fall back to gzip
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/plain", "text/html")
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def negotiate_encoding() -> Optional[str]:
+    """Pick the best encoding from the request's Accept-Encoding header, honouring q-values."""
+    return request.accept_encodings.best_match(supported_encodings())
+
+def compress(body: bytes, encoding: str, app: Flask) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=app.config["COMPRESS_BROTLI_QUALITY"])
+    return gzip.compress(body, compresslevel=app.config["COMPRESS_GZIP_LEVEL"], mtime=0)
+
+def _should_compress(response: Response, app: Flask) -> bool:
+    return (
+        200 <= response.status_code < 300
+        and response.status_code != 204
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and response.content_length is not None
+        and response.content_length >= app.config["COMPRESS_MIN_SIZE"]
+    )
+
+def _set_encoded_body(response: Response, body: bytes, encoding: str):
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+
+class CompressedCache:
+    """Thread-safe LRU of compressed response bodies with a time-to-live."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Tuple[str, str], Tuple[float, bytes, Dict[str, str]]] = OrderedDict()
+
+    def get(self, key: Tuple[str, str], ttl: float) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, body, headers = entry
+            if ttl and time.monotonic() - stored_at > ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body, headers
+
+    def put(self, key: Tuple[str, str], body: bytes, headers: Dict[str, str], max_entries: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, *args, **kwargs):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+compressed_cache = CompressedCache()
+directory_changed.connect(compressed_cache.clear, weak=False)
+
+def cache_compressed(view):
+    """
+    Keep compressed bodies of successful responses of `view`, keyed by path and encoding,
+    so repeated requests skip both the view and the compression.
+    The cache is cleared on every write and entries expire after COMPRESS_CACHE_TTL seconds,
+    which bounds staleness for writes made through other workers.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        app = current_app
+        encoding = negotiate_encoding()
+        if encoding is None or app.config["COMPRESS_CACHE_SIZE"] <= 0:
+            return view(*args, **kwargs)
+
+        key = (request.path, encoding)
+        cached = compressed_cache.get(key, app.config["COMPRESS_CACHE_TTL"])
+        if cached is not None:
+            body, headers = cached
+            response = Response(body, headers=headers)
+            response.headers["Content-Encoding"] = encoding
+            response.vary.add("Accept-Encoding")
+            return response
+
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code == 200 and _should_compress(response, app):
+            body = compress(response.get_data(), encoding, app)
+            _set_encoded_body(response, body, encoding)
+            compressed_cache.put(key, body, {"Content-Type": response.content_type},
+                                 app.config["COMPRESS_CACHE_SIZE"])
+        return response
+
+    return wrapper
+
+def init_compression(app: Flask):
+    """
+    Compress responses with brotli (when installed) or gzip, as negotiated with Accept-Encoding.
+    Bodies smaller than COMPRESS_MIN_SIZE bytes are sent as is.
+    """
+    app.config.setdefault("COMPRESS_MIN_SIZE", env_int("COMPRESS_MIN_SIZE", 1024))
+    app.config.setdefault("COMPRESS_GZIP_LEVEL", env_int("COMPRESS_GZIP_LEVEL", 6))
+    app.config.setdefault("COMPRESS_BROTLI_QUALITY", env_int("COMPRESS_BROTLI_QUALITY", 5))
+    app.config.setdefault("COMPRESS_CACHE_SIZE", env_int("COMPRESS_CACHE_SIZE", 256))
+    app.config.setdefault("COMPRESS_CACHE_TTL", env_int("COMPRESS_CACHE_TTL", 30))
+
+    @app.after_request
+    def _compress_response(response):
+        if "Content-Encoding" in response.headers:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if not _should_compress(response, app):
+            return response
+
+        encoding = negotiate_encoding()
+        if encoding is not None:
+            _set_encoded_body(response, compress(response.get_data(), encoding, app), encoding)
+        return response
@@ -0,0 +1,37 @@
+import os
+from typing import List, Optional
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment ("1", "true", "yes", "on")."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer from the environment."""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+def env_float(name: str, default: float) -> float:
+    """Read a float from the environment."""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return float(value)
+
+def env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a string from the environment, treating empty values as unset."""
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip()
+
+def env_list(name: str, default: Optional[List[str]] = None) -> List[str]:
+    """Read a comma separated list from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return list(default or [])
+    return [item.strip() for item in value.split(",") if item.strip()]
@@ -7,14 +7,14 @@ load_dotenv()
 
 DEFAULT_DATABASE_URL = os.environ.get("DATABASE_URL")
 
-def get_engine(database_url: str = None, echo: bool = True):
+def get_engine(database_url: str = None, echo: bool = True, **engine_options):
     if database_url is None:
         if DEFAULT_DATABASE_URL is None:
             raise ValueError("DATABASE_URL not found. Set it in your environment or pass it explicitly.")
         database_url = DEFAULT_DATABASE_URL
 
     print(f"[DB] Connecting to database at {database_url}")
-    return create_engine(database_url, echo=echo)
+    return create_engine(database_url, echo=echo, **engine_options)
 
 def get_sessionmaker(engine=None):
     if engine is None:
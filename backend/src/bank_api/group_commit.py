@@ -0,0 +1,87 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+class GroupCommitter:
+    """
+    Coalesces writes from concurrent requests into shared transactions.
+
+    `submit` queues an item and returns a future. A background thread waits up to
+    `window` seconds (or until `max_batch` items are queued), then calls
+    `resolve(session, items)` once for the whole batch and commits once, so the
+    commit latency is paid per batch instead of per request. `resolve` returns one
+    result per item. When the batch transaction fails, every item is retried in its
+    own transaction so one failing item cannot fail the others. `on_commit` runs
+    after every committed transaction, its errors are logged and never retried.
+    """
+
+    def __init__(self, session_factory: Callable, resolve: Callable[[Any, List[Any]], List[Any]],
+                 window: float, max_batch: int, on_commit: Callable[[], None] = None):
+        self.session_factory = session_factory
+        self.resolve = resolve
+        self.window = window
+        self.max_batch = max_batch
+        self.on_commit = on_commit
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, items: list) -> list:
+        with self.session_factory() as session:
+            results = self.resolve(session, items)
+            session.commit()
+        return results
+
+    def _notify(self):
+        # the batch is already committed, a failing receiver must not turn it into a retry
+        if self.on_commit is None:
+            return
+        try:
+            self.on_commit()
+        except Exception:
+            logger.exception("Group commit on_commit callback failed")
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            items = [item for item, _ in batch]
+            try:
+                results = self._commit(items)
+            except Exception:
+                for item, future in batch:
+                    try:
+                        result = self._commit([item])[0]
+                    except Exception as e:
+                        future.set_exception(e)
+                        continue
+                    self._notify()
+                    future.set_result(result)
+                continue
+
+            # notify before resolving so callers never read state from before their own write
+            self._notify()
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
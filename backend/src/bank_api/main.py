@@ -1,13 +1,46 @@
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete, insert, or_, tuple_, text
 from bank_api.db import get_engine, get_sessionmaker
 from bank_api.models import PrimaryBank, BranchBank, Country
-
-from flask import Flask, jsonify, request
+from bank_api.profiling import init_profiling
+from bank_api.config import env_bool, env_float, env_int, env_list, env_str
+from bank_api.snapshot import get_snapshot
+from bank_api.signals import directory_changed
+from bank_api.compression import init_compression, cache_compressed
+from bank_api.admission import init_admission, overloaded
+from bank_api.group_commit import GroupCommitter
+from bank_api.changes import DELETE, UPSERT, bank_change, changes_since, current_version, record_changes
+
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from typing import Optional, List
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import ExitStack, contextmanager
+from typing import Optional, List, Tuple
+import json
+import threading
+import time
 
 app = Flask(__name__)
 CORS(app)
+init_profiling(app)
+init_compression(app)
+init_admission(app)
+app.config.setdefault("SNAPSHOT_PATH", env_str("BANK_SNAPSHOT"))
+app.config.setdefault("DB_POOL_SIZE", env_int("DB_POOL_SIZE", 5))
+app.config.setdefault("DB_MAX_OVERFLOW", env_int("DB_MAX_OVERFLOW", 10))
+app.config.setdefault("DB_POOL_TIMEOUT", env_float("DB_POOL_TIMEOUT", 30))
+app.config.setdefault("DB_WARM_CONNECTIONS", env_int("DB_WARM_CONNECTIONS", 2))
+app.config.setdefault("WARM_COUNTRIES", env_list("WARM_COUNTRIES"))
+app.config.setdefault("GROUP_COMMIT_WINDOW_MS", env_float("GROUP_COMMIT_WINDOW_MS", 0))
+app.config.setdefault("GROUP_COMMIT_MAX_BATCH", env_int("GROUP_COMMIT_MAX_BATCH", 100))
+app.config.setdefault("GROUP_COMMIT_TIMEOUT", env_float("GROUP_COMMIT_TIMEOUT", 30))
+app.config.setdefault("CHANGES_POLL_INTERVAL", env_float("CHANGES_POLL_INTERVAL", 1.0))
+app.config.setdefault("CHANGES_KEEPALIVE_INTERVAL", env_float("CHANGES_KEEPALIVE_INTERVAL", 15.0))
+
+MAX_BULK_DELETE = 1000
+DEFAULT_CHANGES_LIMIT = 1000
+MAX_CHANGES_LIMIT = 10000
+# versions are stored as BIGINT
+MAX_VERSION = 2**63 - 1
 
 def is_primary_bank(swift_code: str) -> bool:
     return swift_code.endswith("XXX")
@@ -66,6 +99,38 @@ def get_banks_in_country(session, countryISO2code: str) -> List[PrimaryBank | Br
 
     return [bank[0] for bank in banks]
 
+class SessionDirectory:
+    """Directory lookups against the database, same interface as `bank_api.snapshot.Snapshot`."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def get_country(self, countryISO2: str) -> Optional[Country]:
+        return self.session.get(Country, countryISO2)
+
+    def get_primary_bank(self, swift_code: str) -> Optional[PrimaryBank]:
+        return get_primary_bank_swift(self.session, swift_code)
+
+    def get_branch_bank(self, swift_code: str) -> Optional[BranchBank]:
+        return get_branch_bank_swift(self.session, swift_code)
+
+    def get_branch_banks(self, swift_code: str) -> List[BranchBank]:
+        return get_branch_banks_swift(self.session, swift_code)
+
+    def get_banks_in_country(self, countryISO2: str) -> List[PrimaryBank | BranchBank]:
+        return get_banks_in_country(self.session, countryISO2)
+
+@contextmanager
+def open_directory():
+    """Serve lookups from the memory-mapped snapshot when one is configured, else from the database."""
+    snapshot = get_snapshot(app.config["SNAPSHOT_PATH"])
+    if snapshot is not None:
+        yield snapshot
+        return
+
+    with SessionLocal() as session:
+        yield SessionDirectory(session)
+
 @app.route('/v1/swift-codes/', methods=['GET'])
 @app.route('/v1/swift-codes/<swift_code>', methods=['GET'])
 def get_bank(swift_code: Optional[str] = None):
@@ -81,21 +146,17 @@ def get_bank(swift_code: Optional[str] = None):
         return jsonify({"error": "Swift code must be alphanumeric"}), 400
         
     
-    with SessionLocal() as session:
+    with open_directory() as directory:
         if is_primary_bank(swift_code):
-            bank: PrimaryBank = get_primary_bank_swift(session, swift_code)
+            bank: PrimaryBank = directory.get_primary_bank(swift_code)
             if not bank:
                 return jsonify({"error": "Bank not found"}), 404
 
-            country_name = session.execute(
-                select(Country.country_name).where(
-                    Country.countryISO2 == bank.countryISO2
-                )
-            ).scalar_one_or_none()
-            if not country_name:
+            country = directory.get_country(bank.countryISO2)
+            if not country:
                 return jsonify({"error": "Country not found"}), 404
 
-            branch_banks: List[BranchBank] = get_branch_banks_swift(session, swift_code)
+            branch_banks: List[BranchBank] = directory.get_branch_banks(swift_code)
 
             branches = [{
                 "address": b.address,
@@ -109,36 +170,33 @@ def get_bank(swift_code: Optional[str] = None):
                 address=bank.address,
                 bankName=bank.bank_name,
                 countryISO2=bank.countryISO2,
-                countryName=country_name,
+                countryName=country.country_name,
                 isHeadquarter=bank.is_primary_bank(),
                 swiftCode=bank.full_swift_code(),
                 branches=branches
             ), 200
 
         else:
-            branch: BranchBank = get_branch_bank_swift(session, swift_code)
+            branch: BranchBank = directory.get_branch_bank(swift_code)
             if not branch:
                 return jsonify(error="Bank not found"), 404
             
-            country_name = session.execute(
-                select(Country.country_name).where(
-                    Country.countryISO2 == branch.countryISO2
-                )
-            ).scalar_one_or_none()
-            if not country_name:
+            country = directory.get_country(branch.countryISO2)
+            if not country:
                 return jsonify({"error": "Country not found"}), 404
             
             return jsonify(
                 address=branch.address,
                 bankName=branch.bank_name,
                 countryISO2=branch.countryISO2,
-                countryName=country_name,
+                countryName=country.country_name,
                 isHeadquarter=branch.is_primary_bank(),
                 swiftCode=branch.full_swift_code(),
             ), 200
 
 @app.route('/v1/swift-codes/country/', methods=['GET'])
 @app.route('/v1/swift-codes/country/<countryISO2code>', methods=['GET'])
+@cache_compressed
 def get_banks_country(countryISO2code: Optional[str] = None):
     """
     Return all SWIFT codes with details for a specific
@@ -152,17 +210,13 @@ def get_banks_country(countryISO2code: Optional[str] = None):
     if not countryISO2code.isalnum():
         return jsonify({"error": "Country code must be alphanumeric"}), 400
 
-    with SessionLocal() as session:
-        country: Country = session.execute(
-            select(Country).where(
-                Country.countryISO2 == countryISO2code
-            )
-        ).scalar_one_or_none()
+    with open_directory() as directory:
+        country: Country = directory.get_country(countryISO2code)
         
         if not country:
             return jsonify({"error": "Country not found"}), 404
 
-        banks: List[PrimaryBank] = get_banks_in_country(session, countryISO2code)
+        banks: List[PrimaryBank] = directory.get_banks_in_country(countryISO2code)
         if not banks:
             return jsonify({"error": "No banks found in this country"}), 404
 
@@ -178,6 +232,89 @@ def get_banks_country(countryISO2code: Optional[str] = None):
             } for b in banks]
         ), 200
 
+def create_banks(session, new_banks: List[dict]) -> List[Tuple[dict, int]]:
+    """
+    Insert validated banks with set-based lookups and return a (payload, status) per bank.
+
+    Countries and existing codes are fetched with one query per table for the whole
+    list, and banks are resolved in order, exactly as if they were created one by one.
+    The caller commits.
+    """
+    country_codes = {bank["countryISO2"] for bank in new_banks}
+    primary_prefixes = {bank["swiftCode"][:8] for bank in new_banks if is_primary_bank(bank["swiftCode"])}
+    branch_codes = {(bank["swiftCode"][:8], bank["swiftCode"][8:11]) for bank in new_banks if not is_primary_bank(bank["swiftCode"])}
+
+    countries = dict(session.execute(
+        select(Country.countryISO2, Country.country_name).where(Country.countryISO2.in_(country_codes))
+    ).tuples().all())
+    existing = {f"{prefix}XXX" for prefix in session.execute(
+        select(PrimaryBank.swiftCode).where(PrimaryBank.swiftCode.in_(primary_prefixes))
+    ).scalars()}
+    existing.update(f"{prefix}{branch}" for prefix, branch in session.execute(
+        select(BranchBank.swiftCode, BranchBank.swiftCodeBranch).where(
+            tuple_(BranchBank.swiftCode, BranchBank.swiftCodeBranch).in_(branch_codes)
+        )
+    ).tuples())
+
+    new_countries, new_primaries, new_branches, changes, results = [], [], [], [], []
+    for bank in new_banks:
+        swift_code, countryISO2 = bank["swiftCode"], bank["countryISO2"]
+        if countryISO2 in countries and countries[countryISO2] != bank["countryName"]:
+            results.append(({"error": "Country name mismatch"}, 409))
+            continue
+        if swift_code in existing:
+            results.append(({"error": "Bank already exists"}, 409))
+            continue
+
+        if countryISO2 not in countries:
+            countries[countryISO2] = bank["countryName"]
+            new_countries.append({"countryISO2": countryISO2, "country_name": bank["countryName"]})
+        existing.add(swift_code)
+
+        row = {
+            "swiftCode": swift_code[:8],
+            "address": bank["address"],
+            "bank_name": bank["bankName"],
+            "countryISO2": countryISO2,
+        }
+        if is_primary_bank(swift_code):
+            new_primaries.append(row)
+        else:
+            new_branches.append(dict(row, swiftCodeBranch=swift_code[8:11]))
+        changes.append(bank_change(UPSERT, swift_code, countryISO2, bank["address"], bank["bankName"]))
+        results.append(({"message": "Bank added successfully"}, 201))
+
+    for model, rows in ((Country, new_countries), (PrimaryBank, new_primaries), (BranchBank, new_branches)):
+        if rows:
+            session.execute(insert(model), rows)
+    record_changes(session, changes)
+    return results
+
+_group_committer: Optional[GroupCommitter] = None
+_group_committer_lock = threading.Lock()
+
+def get_group_committer() -> Optional[GroupCommitter]:
+    """
+    Return the group committer when GROUP_COMMIT_WINDOW_MS is set, creating it on first use
+    so the background thread starts in the worker process and not before a fork.
+    """
+    global _group_committer
+    if app.config["GROUP_COMMIT_WINDOW_MS"] <= 0:
+        return None
+
+    with _group_committer_lock:
+        if _group_committer is None:
+            _group_committer = GroupCommitter(
+                session_factory=lambda: SessionLocal(
+                    info={"statement_timeout_ms": app.config["WRITE_STATEMENT_TIMEOUT_MS"]}
+                ),
+                resolve=create_banks,
+                window=app.config["GROUP_COMMIT_WINDOW_MS"] / 1000,
+                max_batch=app.config["GROUP_COMMIT_MAX_BATCH"],
+                on_commit=lambda: directory_changed.send(app),
+            )
+        return _group_committer
+
 @app.route('/v1/swift-codes', methods=['POST'])
 def add_new_code():
     """
@@ -217,81 +354,332 @@ def add_new_code():
     if not isHeadquarter and swiftCode.endswith("XXX"):
         return jsonify({"error": "Branch SWIFT code must not end with 'XXX'"}), 400
 
-    with SessionLocal() as session:
-        country = session.get(Country, countryISO2)
-        if not country:
-            country = Country(countryISO2=countryISO2, country_name=countryName)
-            session.add(country)
-        elif country.country_name != countryName:
-            return jsonify({"error": "Country name mismatch"}), 409
-
-        swift_prefix = swiftCode[:8]
-        swift_branch = swiftCode[8:11]
-
-        if isHeadquarter:
-            existing = session.execute(
-                select(PrimaryBank).where(PrimaryBank.swiftCode == swift_prefix)
-            ).scalar_one_or_none()
-            if existing:
-                return jsonify({"error": "Bank already exists"}), 409
-            session.add(PrimaryBank(
-                swiftCode=swift_prefix,
-                address=address,
-                bank_name=bankName,
-                countryISO2=countryISO2
-            ))
-        else:
-            existing = session.execute(
-                select(BranchBank).where(
-                    and_(
-                        BranchBank.swiftCode == swift_prefix,
-                        BranchBank.swiftCodeBranch == swift_branch
-                    )
-                )
-            ).scalar_one_or_none()
-            if existing:
-                return jsonify({"error": "Bank already exists"}), 409
-            session.add(BranchBank(
-                swiftCode=swift_prefix,
-                swiftCodeBranch=swift_branch,
-                address=address,
-                bank_name=bankName,
-                countryISO2=countryISO2
-            ))
+    new_bank = {
+        "address": address,
+        "bankName": bankName,
+        "countryISO2": countryISO2,
+        "countryName": countryName,
+        "swiftCode": swiftCode,
+    }
+
+    committer = get_group_committer()
+    if committer is not None:
+        try:
+            payload, status = committer.submit(new_bank).result(timeout=app.config["GROUP_COMMIT_TIMEOUT"])
+        except FutureTimeoutError:
+            # the write stays queued and may still be committed, a retry then answers 409
+            return overloaded(app, "Write was not confirmed in time and may still be applied, retry later")
+        return jsonify(payload), status
 
+    with SessionLocal() as session:
+        payload, status = create_banks(session, [new_bank])[0]
+        if status != 201:
+            return jsonify(payload), status
         session.commit()
 
-    return jsonify({"message": "Bank added successfully"}), 201
+    directory_changed.send(app)
+    return jsonify(payload), status
+
+def normalise_swift_code(swift_code: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return the upper-cased SWIFT code, or None and an error message when it is invalid."""
+    swift_code = swift_code.strip().upper()
+    if len(swift_code) != 11:
+        return None, "Swift code must be 11 characters"
+    if not swift_code.isalnum():
+        return None, "Swift code must be alphanumeric"
+    return swift_code, None
+
+def delete_banks(session, swift_codes: List[str] = (), countryISO2: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Delete banks with a single set-based DELETE per table.
+    Deleting a headquarters also deletes every branch sharing its first 8 characters.
+    Returns the number of deleted primary and branch banks.
+    """
+    primary_prefixes = [code[:8] for code in swift_codes if is_primary_bank(code)]
+    branch_codes = [(code[:8], code[8:11]) for code in swift_codes if not is_primary_bank(code)]
+
+    if countryISO2 is not None:
+        primary_filter = PrimaryBank.countryISO2 == countryISO2
+        branch_filter = BranchBank.countryISO2 == countryISO2
+    else:
+        primary_filter = PrimaryBank.swiftCode.in_(primary_prefixes)
+        branch_filter = or_(
+            BranchBank.swiftCode.in_(primary_prefixes),
+            tuple_(BranchBank.swiftCode, BranchBank.swiftCodeBranch).in_(branch_codes),
+        )
+
+    deleted_branches = session.execute(
+        delete(BranchBank).where(branch_filter)
+        .returning(BranchBank.swiftCode, BranchBank.swiftCodeBranch, BranchBank.countryISO2)
+        .execution_options(synchronize_session=False)
+    ).all()
+    deleted_primaries = session.execute(
+        delete(PrimaryBank).where(primary_filter)
+        .returning(PrimaryBank.swiftCode, PrimaryBank.countryISO2)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    record_changes(session, [
+        bank_change(DELETE, f"{prefix}{branch}", country) for prefix, branch, country in deleted_branches
+    ] + [
+        bank_change(DELETE, f"{prefix}XXX", country) for prefix, country in deleted_primaries
+    ])
+    return len(deleted_primaries), len(deleted_branches)
 
 @app.route('/v1/swift-codes/', methods=['DELETE'])
 @app.route('/v1/swift-codes/<swift_code>', methods=['DELETE'])
 def return_code(swift_code: Optional[str] = None):
     """
     Deletes swift-code data if swiftCode matches the one in the database.
+    Deleting a headquarters also deletes its branches.
     """
     if not swift_code:
         return jsonify({"error": "Swift code is required"}), 400
+    swift_code, error = normalise_swift_code(swift_code)
+    if error:
+        return jsonify({"error": error}), 400
     
     with SessionLocal() as session:
-        if is_primary_bank(swift_code):
-            bank: PrimaryBank = get_primary_bank_swift(session, swift_code)
-            if not bank:
-                return jsonify({"error": "Bank not found"}), 404
+        deleted_primaries, deleted_branches = delete_banks(session, [swift_code])
+        deleted = deleted_primaries if is_primary_bank(swift_code) else deleted_branches
+        if not deleted:
+            session.rollback()
+            return jsonify({"error": "Bank not found"}), 404
 
-            session.delete(bank)
-        else:
-            branch: BranchBank = get_branch_bank_swift(session, swift_code)
-            if not branch:
-                return jsonify({"error": "Bank not found"}), 404
+        session.commit()
 
-            session.delete(branch)
+    directory_changed.send(app)
+    return jsonify({"message": "Bank deleted successfully"}), 200
+
+@app.route('/v1/swift-codes', methods=['DELETE'])
+def return_codes():
+    """
+    Deletes all the SWIFT codes listed in the `swiftCodes` field of the body.
+    """
+    body = request.get_json(silent=True) or {}
+    swift_codes = body.get("swiftCodes")
+    if not isinstance(swift_codes, list) or not swift_codes:
+        return jsonify({"error": "swiftCodes must be a non-empty list"}), 400
+    if len(swift_codes) > MAX_BULK_DELETE:
+        return jsonify({"error": f"At most {MAX_BULK_DELETE} swift codes can be deleted at once"}), 400
+
+    normalised = []
+    for code in swift_codes:
+        if not isinstance(code, str):
+            return jsonify({"error": "swiftCodes must be a list of strings"}), 400
+        code, error = normalise_swift_code(code)
+        if error:
+            return jsonify({"error": error}), 400
+        normalised.append(code)
 
+    with SessionLocal() as session:
+        deleted_primaries, deleted_branches = delete_banks(session, normalised)
         session.commit()
-        if session.is_modified:
-            return jsonify({"message": "Bank deleted successfully"}), 200
-        else:
-            return jsonify({"error": "Bank not found"}), 404
+
+    if deleted_primaries or deleted_branches:
+        directory_changed.send(app)
+    return jsonify(
+        message="Banks deleted successfully",
+        deletedHeadquarters=deleted_primaries,
+        deletedBranches=deleted_branches,
+    ), 200
+
+@app.route('/v1/swift-codes/country/<countryISO2code>', methods=['DELETE'])
+def return_country_codes(countryISO2code: str):
+    """
+    Deletes all the SWIFT codes of a specific country.
+    """
+    countryISO2code = countryISO2code.strip().upper()
+    if len(countryISO2code) != 2:
+        return jsonify({"error": "Country code must be 2 characters"}), 400
+    if not countryISO2code.isalnum():
+        return jsonify({"error": "Country code must be alphanumeric"}), 400
+
+    with SessionLocal() as session:
+        if not session.get(Country, countryISO2code):
+            return jsonify({"error": "Country not found"}), 404
+
+        deleted_primaries, deleted_branches = delete_banks(session, countryISO2=countryISO2code)
+        session.commit()
+
+    if deleted_primaries or deleted_branches:
+        directory_changed.send(app)
+    return jsonify(
+        message="Banks deleted successfully",
+        deletedHeadquarters=deleted_primaries,
+        deletedBranches=deleted_branches,
+    ), 200
+
+def parse_non_negative_int(value: str) -> Optional[int]:
+    """Parse a string of ASCII digits, returns None for anything else."""
+    if not value.isascii() or not value.isdigit():
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def parse_changes_args() -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """
+    Read `since` and `limit`, returns an error message when invalid.
+    An SSE client reconnects to the original URL with a Last-Event-ID header,
+    so the larger of `since` and Last-Event-ID wins and the stream resumes where it stopped.
+    """
+    since_values = [
+        parse_non_negative_int(request.args.get("since", "0")),
+        parse_non_negative_int(request.headers.get("Last-Event-ID", "0")),
+    ]
+    limit = parse_non_negative_int(request.args.get("limit", str(DEFAULT_CHANGES_LIMIT)))
+    if any(since is None or since > MAX_VERSION for since in since_values):
+        return None, None, "since must be a non-negative integer"
+    if limit is None or not 0 < limit <= MAX_CHANGES_LIMIT:
+        return None, None, f"limit must be between 1 and {MAX_CHANGES_LIMIT}"
+    return max(since_values), limit, None
+
+@app.route('/v1/changes', methods=['GET'])
+def get_changes():
+    """
+    Return the changes made after version `since`, oldest first.
+    Consumers apply them and ask again with the last version they saw.
+    """
+    since, limit, error = parse_changes_args()
+    if error:
+        return jsonify({"error": error}), 400
+
+    with SessionLocal() as session:
+        latest_version = current_version(session)
+        changes = changes_since(session, since, limit)
+
+    return jsonify(
+        changes=changes,
+        nextSince=changes[-1]["version"] if changes else since,
+        latestVersion=latest_version,
+        hasMore=bool(changes) and changes[-1]["version"] < latest_version,
+    ), 200
+
+@app.route('/v1/changes/stream', methods=['GET'])
+def stream_changes():
+    """
+    Server-Sent Events stream of the changes made after `since` (or Last-Event-ID).
+    Every event carries its version as the event id, so reconnecting clients resume where they stopped.
+    """
+    since, limit, error = parse_changes_args()
+    if error:
+        return jsonify({"error": error}), 400
+
+    session_factory = SessionLocal
+    poll_interval = app.config["CHANGES_POLL_INTERVAL"]
+    keepalive_interval = app.config["CHANGES_KEEPALIVE_INTERVAL"]
+
+    def events():
+        last_version = since
+        last_sent = time.monotonic()
+        while True:
+            with session_factory() as session:
+                changes = changes_since(session, last_version, limit)
+
+            for change in changes:
+                last_version = change["version"]
+                yield f"id: {last_version}\nevent: change\ndata: {json.dumps(change)}\n\n"
+            if changes:
+                last_sent = time.monotonic()
+                continue
+
+            if time.monotonic() - last_sent >= keepalive_interval:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            time.sleep(poll_interval)
+
+    return Response(events(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+_ready = threading.Event()
+_warm_up_lock = threading.Lock()
+
+def warm_up():
+    """
+    Pre-open DB_WARM_CONNECTIONS pooled connections, compile the lookup statements
+    and prime the compressed listing cache for WARM_COUNTRIES, then mark the app ready.
+    """
+    with _warm_up_lock:
+        if _ready.is_set():
+            return
+
+        engine = SessionLocal.kw["bind"]
+        with ExitStack() as stack:
+            # hold the connections at the same time so the pool really opens that many
+            for _ in range(app.config["DB_WARM_CONNECTIONS"]):
+                connection = stack.enter_context(engine.connect())
+                connection.execute(text("SELECT 1"))
+
+        get_snapshot(app.config["SNAPSHOT_PATH"])
+        requests = [("/v1/swift-codes/AAAAAAAAXXX", "identity"), ("/v1/swift-codes/AAAAAAAAAAA", "identity")]
+        for countryISO2code in app.config["WARM_COUNTRIES"]:
+            for encoding in ("identity", "br", "gzip"):
+                requests.append((f"/v1/swift-codes/country/{countryISO2code}", encoding))
+
+        # priming goes through the full request path, a 5xx (including a shed request) means we are not ready.
+        # A fresh app context gives the nested requests their own `g` when called from /readyz.
+        client = app.test_client()
+        with app.app_context():
+            for url, encoding in requests:
+                resp = client.get(url, headers={"Accept-Encoding": encoding})
+                if resp.status_code >= 500:
+                    raise RuntimeError(f"Warm-up request {url} failed with {resp.status_code}")
+
+        _ready.set()
+
+def create_app(engine=None, warm: bool = True) -> Flask:
+    """
+    Configure the app: build the engine and session factory and, unless `warm` is False,
+    warm up the workers before returning so the first requests don't pay for it.
+    """
+    global SessionLocal
+
+    if engine is None:
+        warm_connections = app.config["DB_WARM_CONNECTIONS"]
+        engine = get_engine(
+            echo=env_bool("DB_ECHO", True),
+            pool_size=max(app.config["DB_POOL_SIZE"], warm_connections),
+            max_overflow=app.config["DB_MAX_OVERFLOW"],
+            pool_timeout=app.config["DB_POOL_TIMEOUT"],
+        )
+    SessionLocal = get_sessionmaker(engine)
+    _ready.clear()
+
+    if warm:
+        try:
+            warm_up()
+        except Exception as e:
+            # the readiness probe retries the warm-up until the database is reachable
+            app.logger.warning("Warm-up failed: %s", e)
+
+    return app
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """
+    Liveness probe, the process is up and serving requests.
+    """
+    return jsonify({"status": "ok"}), 200
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness probe, the worker is warmed up and the database is reachable.
+    """
+    try:
+        if not _ready.is_set():
+            warm_up()
+        with SessionLocal() as session:
+            session.execute(text("SELECT 1"))
+    except Exception as e:
+        app.logger.warning("Readiness check failed: %s", e)
+        return jsonify({"status": "unavailable"}), 503
+
+    return jsonify({"status": "ready"}), 200
 
 if __name__ == '__main__':
-    SessionLocal = get_sessionmaker()
-    app.run(host="0.0.0.0", port=8080)
+    create_app().run(host="0.0.0.0", port=8080)
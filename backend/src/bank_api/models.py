@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import DDL, BigInteger, Column, DateTime, Integer, String, event, func
 from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
@@ -40,4 +40,29 @@ class Country(Base):
     country_name = Column(String(255), nullable=False)
 
     def __repr__(self):
-        return f"<Country(countryISO2={self.countryISO2}, country_name={self.country_name})>"
\ No newline at end of file
+        return f"<Country(countryISO2={self.countryISO2}, country_name={self.country_name})>"
+
+class Change(Base):
+    __tablename__ = 'changes'
+    version     = Column(BigInteger, primary_key=True, autoincrement=False)
+    operation   = Column(String(6), nullable=False)
+    swiftCode   = Column(String(11), nullable=False)
+    countryISO2 = Column(String(2), nullable=False)
+    address     = Column(String(255))
+    bank_name   = Column(String(255))
+    created_at  = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<Change(version={self.version}, operation={self.operation}, swiftCode={self.swiftCode})>"
+
+class ChangeVersion(Base):
+    """Single-row counter, updating it locks the row so change versions commit in order."""
+    __tablename__ = 'change_version'
+    id      = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+
+event.listen(
+    ChangeVersion.__table__,
+    "after_create",
+    DDL("INSERT INTO change_version (id, version) VALUES (1, 0)")
+)
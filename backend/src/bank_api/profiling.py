@@ -0,0 +1,179 @@
+import cProfile
+import os
+import re
+import threading
+import time
+import uuid
+
+from flask import Flask, g, has_app_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from bank_api.config import env_bool, env_str
+
+TIMING_HEADER = "X-Server-Timing"
+PROFILE_HEADER = "X-Profile"
+
+# cProfile hooks the whole interpreter, so only one request can be profiled at a time
+_profile_lock = threading.Lock()
+
+class RequestTimings:
+    """Timings collected for a single request."""
+
+    def __init__(self, timing: bool):
+        self.timing = timing
+        self.start = time.perf_counter()
+        self.validation_end: float | None = None
+        self.db = 0.0
+        self.statements = 0
+        self.serialization = 0.0
+        self.profiler: cProfile.Profile | None = None
+
+    def end_validation(self):
+        """Validation ends at the first DB statement or the first serialization."""
+        if self.validation_end is None:
+            self.validation_end = time.perf_counter()
+
+    def header_value(self) -> str:
+        end = time.perf_counter()
+        validation_end = self.validation_end if self.validation_end is not None else end
+        metrics = [
+            f"validation;dur={(validation_end - self.start) * 1000:.3f}",
+            f'db;dur={self.db * 1000:.3f};desc="{self.statements} statements"',
+            f"serialization;dur={self.serialization * 1000:.3f}",
+            f"total;dur={(end - self.start) * 1000:.3f}",
+        ]
+        return ", ".join(metrics)
+
+def current_timings() -> RequestTimings | None:
+    if not has_app_context():
+        return None
+    return g.get("_request_timings")
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that accounts the time spent in `jsonify` as serialization."""
+
+    def response(self, *args, **kwargs):
+        timings = current_timings()
+        if timings is None:
+            return super().response(*args, **kwargs)
+
+        timings.end_validation()
+        start = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            timings.serialization += time.perf_counter() - start
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = current_timings()
+    if timings is None:
+        return
+    timings.end_validation()
+    conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+def _end_statement(conn):
+    starts = conn.info.get("_query_start")
+    if not starts:
+        return
+    start = starts.pop()
+    timings = current_timings()
+    if timings is not None:
+        timings.db += time.perf_counter() - start
+        timings.statements += 1
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _end_statement(conn)
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for failed statements (e.g. cancelled by statement_timeout)
+    if exception_context.connection is not None:
+        _end_statement(exception_context.connection)
+
+def _timing_requested(app: Flask) -> bool:
+    if app.config["SERVER_TIMING"]:
+        return True
+    return app.config["SERVER_TIMING_HEADER"] and request.headers.get(TIMING_HEADER) == "1"
+
+def _profile_requested(app: Flask) -> bool:
+    return bool(app.config["PROFILE_DIR"]) and request.headers.get(PROFILE_HEADER) == "1"
+
+def _dump_profile(app: Flask, profiler: cProfile.Profile) -> str:
+    os.makedirs(app.config["PROFILE_DIR"], exist_ok=True)
+    path_part = re.sub(r"[^A-Za-z0-9]+", "_", request.path).strip("_") or "root"
+    filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{path_part}-{uuid.uuid4().hex[:8]}.prof"
+    path = os.path.join(app.config["PROFILE_DIR"], filename)
+    profiler.dump_stats(path)
+    return path
+
+def _start_profiler(app: Flask) -> cProfile.Profile | None:
+    """Start profiling the request, returns None when another request is being profiled."""
+    if not _profile_lock.acquire(blocking=False):
+        app.logger.info("Skipping profile of %s %s, another request is being profiled", request.method, request.path)
+        return None
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # another profiling tool (e.g. a debugger or sys.monitoring user) is active
+        _profile_lock.release()
+        app.logger.info("Skipping profile of %s %s: %s", request.method, request.path, e)
+        return None
+    return profiler
+
+def _stop_profiler(profiler: cProfile.Profile):
+    profiler.disable()
+    _profile_lock.release()
+
+def init_profiling(app: Flask):
+    """
+    Attach the opt-in Server-Timing / profiling mode to the app.
+
+    SERVER_TIMING adds the header to every response, SERVER_TIMING_HEADER lets
+    clients opt in per request with `X-Server-Timing: 1`. When PROFILE_DIR is set,
+    `X-Profile: 1` dumps a cProfile of that request into the directory.
+    """
+    app.config.setdefault("SERVER_TIMING", env_bool("SERVER_TIMING"))
+    app.config.setdefault("SERVER_TIMING_HEADER", env_bool("SERVER_TIMING_HEADER"))
+    app.config.setdefault("PROFILE_DIR", env_str("PROFILE_DIR"))
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_timings():
+        timing = _timing_requested(app)
+        profile = _profile_requested(app)
+        if not timing and not profile:
+            return
+
+        timings = RequestTimings(timing)
+        if profile:
+            timings.profiler = _start_profiler(app)
+        g._request_timings = timings
+
+    @app.after_request
+    def _finish_timings(response):
+        timings = current_timings()
+        if timings is None:
+            return response
+
+        if timings.profiler is not None:
+            profiler, timings.profiler = timings.profiler, None
+            _stop_profiler(profiler)
+            _dump_profile(app, profiler)
+        if timings.timing:
+            response.headers["Server-Timing"] = timings.header_value()
+        g._request_timings = None
+        return response
+
+    @app.teardown_request
+    def _release_profiler(exc):
+        # after_request is skipped when the request fails, make sure the profiler is released
+        timings = current_timings()
+        if timings is not None and timings.profiler is not None:
+            _stop_profiler(timings.profiler)
+            timings.profiler = None
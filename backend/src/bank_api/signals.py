@@ -0,0 +1,6 @@
+from blinker import Namespace
+
+signals = Namespace()
+
+# Sent once after every committed write, caches subscribe to it to invalidate themselves.
+directory_changed = signals.signal("directory-changed")
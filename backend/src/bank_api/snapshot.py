@@ -0,0 +1,283 @@
+"""
+Precompiled, memory-mappable snapshot of the SWIFT directory.
+
+Layout (little-endian):
+    header      magic, format version, record counts and section offsets
+    countries   sorted by code:         code(2) name(off, len) primaries(start, count) branches(start, count)
+    primaries   sorted by swift prefix: prefix(8) country(2) address(off, len) name(off, len)
+    branches    sorted by prefix+code:  prefix(8) branch(3) country(2) address(off, len) name(off, len)
+    by-country  u32 indices of primaries / branches grouped by country, ranges referenced from `countries`
+    strings     UTF-8 string table, strings are de-duplicated
+
+All records are fixed-width, so lookups are binary searches directly on the
+mapped file and the pages are shared between every process mapping it.
+"""
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select
+
+from bank_api.models import BranchBank, Country, PrimaryBank
+
+MAGIC = b"BANKSNAP"
+VERSION = 1
+
+HEADER = struct.Struct("<8sI3I6Q")
+COUNTRY = struct.Struct("<2s2xIIIIII")
+PRIMARY = struct.Struct("<8s2s2xIIII")
+BRANCH = struct.Struct("<8s3s2s3xIIII")
+
+class SnapshotError(Exception):
+    pass
+
+class SnapshotCountry:
+    __slots__ = ("countryISO2", "country_name")
+
+    def __init__(self, countryISO2: str, country_name: str):
+        self.countryISO2 = countryISO2
+        self.country_name = country_name
+
+class SnapshotBank:
+    """Read-only bank record with the same interface as the ORM models."""
+    __slots__ = ("swiftCode", "swiftCodeBranch", "countryISO2", "address", "bank_name")
+
+    def __init__(self, swiftCode: str, swiftCodeBranch: str, countryISO2: str, address: str, bank_name: str):
+        self.swiftCode = swiftCode
+        self.swiftCodeBranch = swiftCodeBranch
+        self.countryISO2 = countryISO2
+        self.address = address
+        self.bank_name = bank_name
+
+    def full_swift_code(self) -> str:
+        return f"{self.swiftCode}{self.swiftCodeBranch}"
+
+    def is_primary_bank(self) -> bool:
+        return self.swiftCodeBranch == "XXX"
+
+class _StringTable:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, value: str) -> Tuple[int, int]:
+        if value not in self.offsets:
+            encoded = value.encode("utf-8")
+            self.offsets[value] = (len(self.data), len(encoded))
+            self.data.extend(encoded)
+        return self.offsets[value]
+
+def write_snapshot(path: str,
+                   countries: Dict[str, str],
+                   primaries: Dict[str, Tuple[str, str, str]],
+                   branches: Dict[Tuple[str, str], Tuple[str, str, str]]):
+    """
+    Write a snapshot atomically to `path`.
+
+    Takes the same shapes the parser produces: countryISO2 -> name,
+    prefix -> (address, bank name, countryISO2) and
+    (prefix, branch) -> (address, bank name, countryISO2).
+    """
+    strings = _StringTable()
+    country_codes = sorted(countries)
+    primary_codes = sorted(primaries)
+    branch_codes = sorted(branches)
+
+    primary_by_country: Dict[str, List[int]] = {code: [] for code in country_codes}
+    branch_by_country: Dict[str, List[int]] = {code: [] for code in country_codes}
+
+    primary_records = bytearray()
+    for index, prefix in enumerate(primary_codes):
+        address, name, country = primaries[prefix]
+        primary_by_country.setdefault(country, []).append(index)
+        primary_records += PRIMARY.pack(prefix.encode("ascii"), country.encode("ascii"),
+                                        *strings.add(address), *strings.add(name))
+
+    branch_records = bytearray()
+    for index, (prefix, branch) in enumerate(branch_codes):
+        address, name, country = branches[(prefix, branch)]
+        branch_by_country.setdefault(country, []).append(index)
+        branch_records += BRANCH.pack(prefix.encode("ascii"), branch.encode("ascii"), country.encode("ascii"),
+                                      *strings.add(address), *strings.add(name))
+
+    primary_index, branch_index = array("I"), array("I")
+    country_records = bytearray()
+    for code in country_codes:
+        p_start, b_start = len(primary_index), len(branch_index)
+        primary_index.extend(primary_by_country[code])
+        branch_index.extend(branch_by_country[code])
+        country_records += COUNTRY.pack(code.encode("ascii"), *strings.add(countries[code]),
+                                        p_start, len(primary_by_country[code]),
+                                        b_start, len(branch_by_country[code]))
+    if sys.byteorder == "big":
+        primary_index.byteswap()
+        branch_index.byteswap()
+
+    sections = [country_records, primary_records, branch_records,
+                primary_index.tobytes(), branch_index.tobytes(), strings.data]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(country_codes), len(primary_codes), len(branch_codes), *offsets))
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, path)
+
+def export_snapshot(session, path: str):
+    """Write a snapshot of everything currently stored in the database."""
+    countries = dict(session.execute(select(Country.countryISO2, Country.country_name)).tuples().all())
+    primaries = {
+        prefix: (address or "", name, country)
+        for prefix, address, name, country in session.execute(select(
+            PrimaryBank.swiftCode, PrimaryBank.address, PrimaryBank.bank_name, PrimaryBank.countryISO2
+        )).tuples()
+    }
+    branches = {
+        (prefix, branch): (address or "", name, country)
+        for prefix, branch, address, name, country in session.execute(select(
+            BranchBank.swiftCode, BranchBank.swiftCodeBranch, BranchBank.address,
+            BranchBank.bank_name, BranchBank.countryISO2
+        )).tuples()
+    }
+    write_snapshot(path, countries, primaries, branches)
+
+def _ascii_key(value: str) -> bytes | None:
+    """Encode a lookup key, keys with non-ASCII characters cannot be in the snapshot."""
+    return value.encode("ascii") if value.isascii() else None
+
+class Snapshot:
+    """Memory-mapped snapshot, exposes the same lookups the API runs against the database."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if stat.st_size < HEADER.size:
+                raise SnapshotError(f"{path} is not a directory snapshot")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.country_count, self.primary_count, self.branch_count,
+         self._countries, self._primaries, self._branches,
+         self._primary_index, self._branch_index, self._strings) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a directory snapshot")
+        if version != VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}, expected {VERSION}")
+
+    def close(self):
+        self._mm.close()
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _lower_bound(self, base: int, count: int, size: int, key: bytes) -> int:
+        mm, key_len = self._mm, len(key)
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = base + mid * size
+            if mm[offset:offset + key_len] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, base: int, count: int, size: int, key: bytes | None) -> int | None:
+        if key is None:
+            return None
+        index = self._lower_bound(base, count, size, key)
+        offset = base + index * size
+        if index < count and self._mm[offset:offset + len(key)] == key:
+            return index
+        return None
+
+    def _primary(self, index: int) -> SnapshotBank:
+        prefix, country, a_off, a_len, n_off, n_len = PRIMARY.unpack_from(self._mm, self._primaries + index * PRIMARY.size)
+        return SnapshotBank(prefix.decode("ascii"), "XXX", country.decode("ascii"),
+                            self._string(a_off, a_len), self._string(n_off, n_len))
+
+    def _branch(self, index: int) -> SnapshotBank:
+        prefix, branch, country, a_off, a_len, n_off, n_len = BRANCH.unpack_from(self._mm, self._branches + index * BRANCH.size)
+        return SnapshotBank(prefix.decode("ascii"), branch.decode("ascii"), country.decode("ascii"),
+                            self._string(a_off, a_len), self._string(n_off, n_len))
+
+    def _country_record(self, countryISO2: str) -> tuple | None:
+        index = self._find(self._countries, self.country_count, COUNTRY.size, _ascii_key(countryISO2))
+        if index is None:
+            return None
+        return COUNTRY.unpack_from(self._mm, self._countries + index * COUNTRY.size)
+
+    def get_country(self, countryISO2: str) -> SnapshotCountry | None:
+        record = self._country_record(countryISO2)
+        if record is None:
+            return None
+        code, n_off, n_len, *_ = record
+        return SnapshotCountry(code.decode("ascii"), self._string(n_off, n_len))
+
+    def get_primary_bank(self, swift_code: str) -> SnapshotBank | None:
+        index = self._find(self._primaries, self.primary_count, PRIMARY.size, _ascii_key(swift_code[:8]))
+        return None if index is None else self._primary(index)
+
+    def get_branch_bank(self, swift_code: str) -> SnapshotBank | None:
+        index = self._find(self._branches, self.branch_count, BRANCH.size, _ascii_key(swift_code[:11]))
+        return None if index is None else self._branch(index)
+
+    def get_branch_banks(self, swift_code: str) -> List[SnapshotBank]:
+        prefix = _ascii_key(swift_code[:8])
+        if prefix is None:
+            return []
+        index = self._lower_bound(self._branches, self.branch_count, BRANCH.size, prefix)
+        banks = []
+        while index < self.branch_count:
+            offset = self._branches + index * BRANCH.size
+            if self._mm[offset:offset + 8] != prefix:
+                break
+            banks.append(self._branch(index))
+            index += 1
+        return banks
+
+    def get_banks_in_country(self, countryISO2: str) -> List[SnapshotBank]:
+        record = self._country_record(countryISO2)
+        if record is None:
+            return []
+        _, _, _, p_start, p_count, b_start, b_count = record
+
+        primary_index = struct.unpack_from(f"<{p_count}I", self._mm, self._primary_index + p_start * 4)
+        branch_index = struct.unpack_from(f"<{b_count}I", self._mm, self._branch_index + b_start * 4)
+        return [self._primary(i) for i in primary_index] + [self._branch(i) for i in branch_index]
+
+_lock = threading.Lock()
+_open_snapshots: Dict[str, Snapshot] = {}
+
+def get_snapshot(path: str | None) -> Snapshot | None:
+    """
+    Return the mapped snapshot for `path`, (re)opening it when the file was replaced.
+    Returns None when no snapshot is configured.
+    """
+    if not path:
+        return None
+
+    stat = os.stat(path)
+    identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    snapshot = _open_snapshots.get(path)
+    if snapshot is not None and snapshot.identity == identity:
+        return snapshot
+
+    with _lock:
+        snapshot = _open_snapshots.get(path)
+        if snapshot is None or snapshot.identity != identity:
+            # the previous mapping is left to the garbage collector, requests may still be reading it
+            snapshot = Snapshot(path)
+            _open_snapshots[path] = snapshot
+        return snapshot
@@ -0,0 +1,49 @@
+import argparse
+import json
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """Flatten nested benchmark results into `a.b.c -> value` pairs."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("per_sec")
+
+def compare(base: dict, head: dict, threshold: float) -> list[tuple[str, float, float, float, str]]:
+    """Return (metric, base, head, change %, verdict) for metrics present in both files."""
+    base_flat = flatten(base["results"])
+    head_flat = flatten(head["results"])
+
+    rows = []
+    for metric in sorted(base_flat.keys() & head_flat.keys()):
+        if not metric.endswith(("_ms", "seconds", "per_sec", "_bytes")):
+            continue
+        old, new = base_flat[metric], head_flat[metric]
+        change = (new - old) / old * 100 if old else 0.0
+        improved = change > 0 if higher_is_better(metric) else change < 0
+        verdict = "" if abs(change) < threshold else ("faster" if improved else "SLOWER")
+        rows.append((metric, old, new, change, verdict))
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=5.0, help="ignore changes below this percentage")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print(f"base: {base['meta'].get('commit')} ({base['meta'].get('database')})")
+    print(f"head: {head['meta'].get('commit')} ({head['meta'].get('database')})")
+    for metric, old, new, change, verdict in compare(base, head, args.threshold):
+        print(f"{metric:<60} {old:>12.3f} {new:>12.3f} {change:>+8.1f}% {verdict}")
@@ -0,0 +1,62 @@
+import gzip
+import time
+from collections import Counter
+
+import bank_api.main as main_mod
+from bank_api.compression import brotli, compressed_cache
+from bank_api.db import get_sessionmaker
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 5, 11)
+
+def largest_countries(filename: str, count: int) -> list[str]:
+    countries = Counter()
+    with open(filename) as csvfile:
+        next(csvfile)
+        for line in csvfile:
+            countries[line[:2]] += 1
+    return [iso2 for iso2, _ in countries.most_common(count)]
+
+def time_call(func, repeat: int) -> float:
+    """Mean wall time of `func` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def bench_compression(engine, filename: str, countries: int = 3, repeat: int = 20) -> dict:
+    """
+    Bytes on the wire and CPU cost of compressing the largest country listings,
+    plus request latency without compression, with compression and from the compressed cache.
+    """
+    main_mod.SessionLocal = get_sessionmaker(engine)
+    client = main_mod.app.test_client()
+    results = {}
+
+    for iso2 in largest_countries(filename, countries):
+        url = f"/v1/swift-codes/country/{iso2}"
+        body = client.get(url, headers={"Accept-Encoding": "identity"}).data
+        result = {"identity_bytes": len(body)}
+
+        for level in GZIP_LEVELS:
+            result[f"gzip_{level}_bytes"] = len(gzip.compress(body, compresslevel=level, mtime=0))
+            result[f"gzip_{level}_compress_ms"] = time_call(
+                lambda: gzip.compress(body, compresslevel=level, mtime=0), repeat)
+        if brotli is not None:
+            for quality in BROTLI_QUALITIES:
+                result[f"br_{quality}_bytes"] = len(brotli.compress(body, quality=quality))
+                result[f"br_{quality}_compress_ms"] = time_call(
+                    lambda: brotli.compress(body, quality=quality), max(1, repeat // 4))
+
+        def uncached(encoding: str):
+            compressed_cache.clear()
+            client.get(url, headers={"Accept-Encoding": encoding})
+
+        result["request_identity_ms"] = time_call(lambda: client.get(url, headers={"Accept-Encoding": "identity"}), repeat)
+        result["request_gzip_uncached_ms"] = time_call(lambda: uncached("gzip"), repeat)
+        client.get(url, headers={"Accept-Encoding": "gzip"})
+        result["request_gzip_cached_ms"] = time_call(lambda: client.get(url, headers={"Accept-Encoding": "gzip"}), repeat)
+        results[iso2] = result
+
+    compressed_cache.clear()
+    return results
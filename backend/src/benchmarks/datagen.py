@@ -0,0 +1,117 @@
+import argparse
+import csv
+import os
+import random
+import string
+
+HEADER = [
+    "COUNTRY ISO2 CODE",
+    "SWIFT CODE",
+    "CODE TYPE",
+    "NAME",
+    "ADDRESS",
+    "TOWN NAME",
+    "COUNTRY NAME",
+    "TIME ZONE",
+]
+
+# (ISO2, name, time zone, towns, weight) - weights roughly follow the skew of the real directory
+COUNTRIES = [
+    ("US", "UNITED STATES", "America/New_York", ["NEW YORK", "CHICAGO", "MIAMI", "SAN FRANCISCO"], 18),
+    ("DE", "GERMANY", "Europe/Berlin", ["FRANKFURT AM MAIN", "BERLIN", "MUNICH", "HAMBURG"], 12),
+    ("GB", "UNITED KINGDOM", "Europe/London", ["LONDON", "MANCHESTER", "EDINBURGH"], 10),
+    ("FR", "FRANCE", "Europe/Paris", ["PARIS", "LYON", "MARSEILLE"], 9),
+    ("IT", "ITALY", "Europe/Rome", ["ROME", "MILAN", "TURIN"], 8),
+    ("ES", "SPAIN", "Europe/Madrid", ["MADRID", "BARCELONA", "VALENCIA"], 6),
+    ("PL", "POLAND", "Europe/Warsaw", ["WARSZAWA", "KRAKOW", "GDANSK", "POZNAN"], 6),
+    ("CH", "SWITZERLAND", "Europe/Zurich", ["ZURICH", "GENEVA", "BASEL"], 5),
+    ("JP", "JAPAN", "Asia/Tokyo", ["TOKYO", "OSAKA"], 5),
+    ("CN", "CHINA", "Asia/Shanghai", ["BEIJING", "SHANGHAI", "SHENZHEN"], 5),
+    ("BR", "BRAZIL", "America/Sao_Paulo", ["SAO PAULO", "RIO DE JANEIRO"], 3),
+    ("CA", "CANADA", "America/Toronto", ["TORONTO", "MONTREAL", "VANCOUVER"], 3),
+    ("BG", "BULGARIA", "Europe/Sofia", ["SOFIA", "VARNA", "PLOVDIV"], 2),
+    ("AL", "ALBANIA", "Europe/Tirane", ["TIRANA", "DURRES"], 1),
+    ("UY", "URUGUAY", "America/Montevideo", ["MONTEVIDEO"], 1),
+    ("LV", "LATVIA", "Europe/Riga", ["RIGA"], 1),
+    ("MT", "MALTA", "Europe/Malta", ["VALLETTA", "SLIEMA"], 1),
+    ("CL", "CHILE", "America/Santiago", ["SANTIAGO"], 1),
+    ("MC", "MONACO", "Europe/Monaco", ["MONACO"], 1),
+    ("AW", "ARUBA", "America/Aruba", ["ORANJESTAD"], 1),
+]
+
+NAME_WORDS = [
+    "FIRST", "NATIONAL", "COMMERCIAL", "SAVINGS", "INVESTMENT", "TRUST", "UNITED",
+    "CENTRAL", "INTERNATIONAL", "COOPERATIVE", "MERCHANT", "CAPITAL", "PRIVATE", "UNION",
+]
+NAME_SUFFIXES = ["BANK", "BANK AG", "BANK PLC", "BANK S.A.", "BANK SH.A", "SECURITIES LTD", "CREDIT UNION"]
+STREETS = ["MAIN ST", "MARKET SQ", "KING ST", "BAHNHOFSTRASSE", "RUE DE LA PAIX", "VIA ROMA", "UL. PROSTA"]
+
+ALNUM = string.ascii_uppercase + string.digits
+
+def generate_rows(rows: int, seed: int = 42, branches_per_hq: float = 2.0):
+    """
+    Yield `rows` synthetic directory rows in the `data.csv` format.
+
+    About 1 / (1 + branches_per_hq) of the rows are headquarters, the rest are
+    branches that share the first 8 characters with their headquarters.
+    The output only depends on `rows`, `seed` and `branches_per_hq`.
+    """
+    rng = random.Random(seed)
+    weights = [c[4] for c in COUNTRIES]
+    seen_prefixes = set()
+    produced = 0
+
+    while produced < rows:
+        iso2, country_name, time_zone, towns, _ = rng.choices(COUNTRIES, weights=weights)[0]
+
+        while True:
+            bank = "".join(rng.choices(string.ascii_uppercase, k=4))
+            location = "".join(rng.choices(ALNUM, k=2))
+            prefix = f"{bank}{iso2}{location}"
+            if prefix not in seen_prefixes:
+                seen_prefixes.add(prefix)
+                break
+
+        name = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {rng.choice(NAME_SUFFIXES)}"
+        town = rng.choice(towns)
+
+        branch_count = min(int(rng.expovariate(1 / branches_per_hq)), rows - produced - 1)
+        branch_codes = set()
+        while len(branch_codes) < branch_count:
+            code = "".join(rng.choices(ALNUM, k=3))
+            if code != "XXX":
+                branch_codes.add(code)
+
+        for branch in ["XXX", *sorted(branch_codes)]:
+            branch_town = town if branch == "XXX" else rng.choice(towns)
+            address = f"{rng.randint(1, 300)} {rng.choice(STREETS)} {branch_town}, {branch_town}, {rng.randint(1000, 99999)}"
+            yield [iso2, f"{prefix}{branch}", "BIC11", name, address, branch_town, country_name, time_zone]
+            produced += 1
+
+def write_csv(filename: str, rows: int, seed: int = 42):
+    """Write a synthetic directory with `rows` rows to `filename`."""
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(filename, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(HEADER)
+        writer.writerows(generate_rows(rows, seed))
+
+def dataset_path(rows: int, seed: int = 42, data_dir: str = "benchmarks/data") -> str:
+    """Return the path of the cached dataset, generating it on first use."""
+    filename = os.path.join(data_dir, f"swift_{rows}_{seed}.csv")
+    if not os.path.exists(filename):
+        write_csv(filename, rows, seed)
+    return filename
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic SWIFT directory in the data.csv format.")
+    parser.add_argument("rows", type=int, nargs="+", help="number of rows, e.g. 10000 100000 1000000")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        print(dataset_path(rows, args.seed, args.data_dir))
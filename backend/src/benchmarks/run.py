@@ -0,0 +1,225 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import bank_api.main as main_mod
+from bank_api.db import get_engine, get_sessionmaker
+from bank_api.models import Base
+from benchmarks.compression import bench_compression
+from benchmarks.datagen import dataset_path
+from data_parser.parser import load_data
+
+DEFAULT_DATABASE_URL = "sqlite:///benchmarks/data/bench.db"
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def latency_stats(samples: list[float]) -> dict:
+    """Summarise a list of latencies (in seconds) in milliseconds."""
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "requests": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "requests_per_sec": len(ordered) / sum(ordered),
+    }
+
+def reset_schema(engine):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+def bench_parser(engine, filename: str, rows: int) -> dict:
+    """Time `load_data` on a fresh schema."""
+    reset_schema(engine)
+    session = get_sessionmaker(engine)()
+
+    start = time.perf_counter()
+    load_data(filename, session)
+    elapsed = time.perf_counter() - start
+
+    return {"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed}
+
+def pick_samples(filename: str, count: int) -> dict:
+    """Pick deterministic HQ, branch and country samples from a generated dataset."""
+    primaries, branches = [], []
+    countries = Counter()
+    with open(filename, newline="") as csvfile:
+        for row in csv.DictReader(csvfile):
+            code = row["SWIFT CODE"]
+            (primaries if code.endswith("XXX") else branches).append(code)
+            countries[row["COUNTRY ISO2 CODE"]] += 1
+
+    ranked = [iso2 for iso2, _ in countries.most_common()]
+    step_p = max(1, len(primaries) // count)
+    step_b = max(1, len(branches) // count)
+    return {
+        "primaries": primaries[::step_p][:count],
+        "branches": branches[::step_b][:count] or primaries[:1],
+        "largest_country": ranked[0],
+        "smallest_country": ranked[-1],
+    }
+
+def time_requests(client, requests: list[tuple[str, str, dict | None]]) -> list[float]:
+    samples = []
+    for method, url, body in requests:
+        start = time.perf_counter()
+        resp = client.open(url, method=method, json=body)
+        samples.append(time.perf_counter() - start)
+        if resp.status_code >= 500:
+            raise RuntimeError(f"{method} {url} failed with {resp.status_code}")
+    return samples
+
+def new_bank(i: int) -> dict:
+    return {
+        "address": f"{i} BENCHMARK ST",
+        "bankName": f"BENCHMARK BANK {i}",
+        "countryISO2": "ZZ",
+        "countryName": "BENCHMARKLAND",
+        "isHeadquarter": True,
+        "swiftCode": f"ZZ{i:06d}XXX",
+    }
+
+def bench_endpoints(engine, filename: str, requests: int, country_requests: int) -> dict:
+    """Measure latency of every route in-process through the Flask test client."""
+    main_mod.SessionLocal = get_sessionmaker(engine)
+    samples = pick_samples(filename, requests)
+    client = main_mod.app.test_client()
+
+    routes = {
+        "get_bank_headquarter": [("GET", f"/v1/swift-codes/{c}", None) for c in samples["primaries"]],
+        "get_bank_branch": [("GET", f"/v1/swift-codes/{c}", None) for c in samples["branches"]],
+        "get_bank_not_found": [("GET", "/v1/swift-codes/ZZZZZZZZZZZ", None)] * requests,
+        "get_banks_country_largest": [
+            ("GET", f"/v1/swift-codes/country/{samples['largest_country']}", None)
+        ] * country_requests,
+        "get_banks_country_smallest": [
+            ("GET", f"/v1/swift-codes/country/{samples['smallest_country']}", None)
+        ] * requests,
+        "add_new_code": [("POST", "/v1/swift-codes", new_bank(i)) for i in range(requests)],
+        "return_code": [("DELETE", f"/v1/swift-codes/{new_bank(i)['swiftCode']}", None) for i in range(requests)],
+    }
+
+    results = {}
+    for name, route_requests in routes.items():
+        # one untimed request per route to warm up connections and code paths
+        if not name.startswith(("add_", "return_")):
+            time_requests(client, route_requests[:1])
+        results[name] = latency_stats(time_requests(client, route_requests))
+    return results
+
+def bench_throughput(engine, filename: str, requests: int, concurrency: int) -> dict:
+    """Measure read throughput with `concurrency` threads issuing lookups."""
+    main_mod.SessionLocal = get_sessionmaker(engine)
+    samples = pick_samples(filename, requests)
+    urls = [f"/v1/swift-codes/{c}" for c in samples["primaries"] + samples["branches"]]
+
+    def worker(offset: int) -> int:
+        client = main_mod.app.test_client()
+        for i in range(requests):
+            client.get(urls[(offset + i) % len(urls)])
+        return requests
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        total = sum(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {"concurrency": concurrency, "requests": total, "requests_per_sec": total / elapsed}
+
+def bench_write_throughput(engine, requests: int, concurrency: int, group_commit_ms: float, offset: int) -> dict:
+    """Measure POST throughput with `concurrency` threads, optionally with group commit enabled."""
+    main_mod.SessionLocal = get_sessionmaker(engine)
+    main_mod.app.config["GROUP_COMMIT_WINDOW_MS"] = group_commit_ms
+
+    def worker(thread: int) -> int:
+        client = main_mod.app.test_client()
+        for i in range(requests):
+            resp = client.post("/v1/swift-codes", json=new_bank(offset + thread * requests + i))
+            if resp.status_code != 201:
+                raise RuntimeError(f"POST failed with {resp.status_code}")
+        return requests
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            total = sum(pool.map(worker, range(concurrency)))
+    finally:
+        main_mod.app.config["GROUP_COMMIT_WINDOW_MS"] = 0
+    elapsed = time.perf_counter() - start
+
+    return {"concurrency": concurrency, "group_commit_ms": group_commit_ms,
+            "requests": total, "requests_per_sec": total / elapsed}
+
+def run(args) -> dict:
+    engine = get_engine(args.database_url, echo=False)
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+
+    for rows in args.rows:
+        filename = dataset_path(rows, args.seed, args.data_dir)
+        print(f"[bench] {rows} rows ({filename})")
+        result = {"parser": bench_parser(engine, filename, rows)}
+        if not args.parser_only:
+            result["endpoints"] = bench_endpoints(engine, filename, args.requests, args.country_requests)
+            result["throughput"] = bench_throughput(engine, filename, args.requests, args.concurrency)
+            result["compression"] = bench_compression(engine, filename)
+            writes = args.requests * args.concurrency
+            result["write_throughput"] = bench_write_throughput(
+                engine, args.requests, args.concurrency, 0, offset=100000)
+            result["write_throughput_group_commit"] = bench_write_throughput(
+                engine, args.requests, args.concurrency, args.group_commit_ms, offset=100000 + writes)
+        results["results"][str(rows)] = result
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run parser and endpoint benchmarks.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000],
+                        help="dataset sizes to benchmark, e.g. 10000 100000 1000000")
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL),
+                        help="SQLite or PostgreSQL URL; the schema is dropped and recreated")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--country-requests", type=int, default=20, help="requests for the largest country listing")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--group-commit-ms", type=float, default=5, help="group commit window for the write benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--parser-only", action="store_true")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = run(args)
+
+    output = args.output or os.path.join("benchmarks", "results", f"{results['meta']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"[bench] results written to {output}")
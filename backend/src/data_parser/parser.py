@@ -1,79 +1,192 @@
+import argparse
 import csv
-from sqlalchemy import select
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from sqlalchemy import insert, select
 
 from bank_api.models import Country, PrimaryBank, BranchBank, Base
 from bank_api.db import get_sessionmaker
+from bank_api.snapshot import export_snapshot
+from bank_api.changes import UPSERT, bank_change, record_changes
 
+REQUIRED_FIELDS = ('SWIFT CODE', 'NAME', 'ADDRESS', 'COUNTRY ISO2 CODE', 'COUNTRY NAME')
 
-def load_data(filename: str, session):
-    
-    def is_primary_bank(swift: str) -> bool:
-        return swift.endswith("XXX")
-    
-    try:
-        with open(filename, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # check if row is empty
-                if not any(row.values()):
-                    continue
-                if not row['SWIFT CODE'] or not row['NAME'] or not row['ADDRESS'] or not row['COUNTRY ISO2 CODE'] or not row['COUNTRY NAME']:
-                    continue
-                raw_swift = row['SWIFT CODE'].strip()
-                primary_code = raw_swift[:8]
-                branch_code  = raw_swift[8:11]
-
-                # 1) country upsert
-                country = session.get(Country, row['COUNTRY ISO2 CODE'])
-                if not country:
-                    country = Country(
-                        countryISO2  = row['COUNTRY ISO2 CODE'],
-                        country_name = row['COUNTRY NAME']
-                    )
-                    session.add(country)
-
-                # 2) bank existence check
-                if is_primary_bank(raw_swift):
-                    exists = session.execute(
-                        select(PrimaryBank).where(PrimaryBank.swiftCode == primary_code)
-                    ).scalar_one_or_none()
-                    if not exists:
-                        session.add(PrimaryBank(
-                            swiftCode   = primary_code,
-                            address     = row['ADDRESS'].strip(),
-                            bank_name   = row['NAME'],
-                            countryISO2 = row['COUNTRY ISO2 CODE']
-                        ))
-                else:
-                    exists = session.execute(
-                        select(BranchBank).where(
-                            BranchBank.swiftCode       == primary_code,
-                            BranchBank.swiftCodeBranch == branch_code
-                        )
-                    ).scalar_one_or_none()
-                    if not exists:
-                        session.add(BranchBank(
-                            swiftCode        = primary_code,
-                            swiftCodeBranch  = branch_code,
-                            address          = row['ADDRESS'].strip(),
-                            bank_name        = row['NAME'],
-                            countryISO2      = row['COUNTRY ISO2 CODE']
-                        ))
+# countryISO2 -> country name
+Countries = Dict[str, str]
+# swift prefix -> (address, bank name, countryISO2)
+Primaries = Dict[str, Tuple[str, str, str]]
+# (swift prefix, branch code) -> (address, bank name, countryISO2)
+Branches = Dict[Tuple[str, str], Tuple[str, str, str]]
+
+def normalise_row(row: dict) -> dict | None:
+    """Strip and upper-case a CSV row, returns None for empty or invalid rows."""
+    if not all(row.get(field) for field in REQUIRED_FIELDS):
+        return None
+    values = {field: row[field].strip() for field in REQUIRED_FIELDS}
+
+    swift = values['SWIFT CODE'].upper()
+    country = values['COUNTRY ISO2 CODE'].upper()
+    if not values['NAME'] or not values['COUNTRY NAME']:
+        return None
+    if len(swift) != 11 or not swift.isalnum():
+        return None
+    if len(country) != 2 or not country.isalnum():
+        return None
+
+    return {
+        "swift_prefix": swift[:8],
+        "swift_branch": swift[8:11],
+        "countryISO2": country,
+        "country_name": values['COUNTRY NAME'],
+        "bank_name": values['NAME'],
+        "address": values['ADDRESS'],
+    }
+
+def parse_file(filename: str) -> Tuple[Countries, Primaries, Branches]:
+    """
+    Parse, validate and de-duplicate a single CSV file.
+    The first occurrence of a country or SWIFT code wins.
+    """
+    countries: Countries = {}
+    primaries: Primaries = {}
+    branches: Branches = {}
+
+    with open(filename, newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            record = normalise_row(row)
+            if record is None:
+                continue
+
+            countries.setdefault(record["countryISO2"], record["country_name"])
+            bank = (record["address"], record["bank_name"], record["countryISO2"])
+            if record["swift_branch"] == "XXX":
+                primaries.setdefault(record["swift_prefix"], bank)
+            else:
+                branches.setdefault((record["swift_prefix"], record["swift_branch"]), bank)
+
+    return countries, primaries, branches
+
+def parse_files(filenames: List[str], workers: int | None = None) -> Tuple[Countries, Primaries, Branches]:
+    """
+    Parse files in a process pool and merge them in the given order.
+    Files are the unit of work, so the speed-up is bounded by the number of files.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(filenames)))
+
+    if workers == 1:
+        parsed = [parse_file(filename) for filename in filenames]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(parse_file, filenames))
+
+    countries: Countries = {}
+    primaries: Primaries = {}
+    branches: Branches = {}
+    for file_countries, file_primaries, file_branches in parsed:
+        for key, value in file_countries.items():
+            countries.setdefault(key, value)
+        for key, value in file_primaries.items():
+            primaries.setdefault(key, value)
+        for key, value in file_branches.items():
+            branches.setdefault(key, value)
+
+    return countries, primaries, branches
 
+def _insert_in_batches(session, model, rows: List[dict], batch_size: int):
+    for start in range(0, len(rows), batch_size):
+        session.execute(insert(model), rows[start:start + batch_size])
+
+def write_records(session, countries: Countries, primaries: Primaries, branches: Branches,
+                  batch_size: int = 5000) -> Tuple[int, int, int]:
+    """
+    Bulk-insert parsed records that are not in the database yet.
+    Returns the number of inserted countries, primary banks and branch banks.
+    """
+    existing_countries = set(session.execute(select(Country.countryISO2)).scalars())
+    existing_primaries = set(session.execute(select(PrimaryBank.swiftCode)).scalars())
+    existing_branches = set(session.execute(
+        select(BranchBank.swiftCode, BranchBank.swiftCodeBranch)
+    ).tuples())
+
+    new_countries = [
+        {"countryISO2": code, "country_name": name}
+        for code, name in countries.items() if code not in existing_countries
+    ]
+    new_primaries = [
+        {"swiftCode": prefix, "address": address, "bank_name": name, "countryISO2": country}
+        for prefix, (address, name, country) in primaries.items() if prefix not in existing_primaries
+    ]
+    new_branches = [
+        {"swiftCode": prefix, "swiftCodeBranch": branch, "address": address, "bank_name": name, "countryISO2": country}
+        for (prefix, branch), (address, name, country) in branches.items() if (prefix, branch) not in existing_branches
+    ]
+
+    _insert_in_batches(session, Country, new_countries, batch_size)
+    _insert_in_batches(session, PrimaryBank, new_primaries, batch_size)
+    _insert_in_batches(session, BranchBank, new_branches, batch_size)
+
+    record_changes(session, [
+        bank_change(UPSERT, f"{row['swiftCode']}XXX", row["countryISO2"], row["address"], row["bank_name"])
+        for row in new_primaries
+    ] + [
+        bank_change(UPSERT, f"{row['swiftCode']}{row['swiftCodeBranch']}", row["countryISO2"], row["address"], row["bank_name"])
+        for row in new_branches
+    ], batch_size)
+
+    return len(new_countries), len(new_primaries), len(new_branches)
+
+def load_files(filenames: List[str], session, workers: int | None = None, batch_size: int = 5000):
+    """Parse `filenames` in parallel and load them with a single bulk writer."""
+    try:
+        countries, primaries, branches = parse_files(filenames, workers)
+        inserted = write_records(session, countries, primaries, branches, batch_size)
         session.commit()
+        return inserted
     except:
         session.rollback()
         raise
     finally:
         session.close()
 
+def load_data(filename: str, session):
+    return load_files([filename], session, workers=1)
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """Expand globs, keeping the order of the arguments and dropping duplicates."""
+    filenames = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise FileNotFoundError(f"No files match {pattern}")
+        for filename in matches:
+            if filename not in filenames:
+                filenames.append(filename)
+    return filenames
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load SWIFT directory CSV files into the database.")
+    parser.add_argument("paths", nargs="*", default=["data_parser/data.csv"],
+                        help="CSV files or globs, e.g. 'regions/*.csv'")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per bulk INSERT")
+    parser.add_argument("--snapshot", help="also write a binary directory snapshot of the database to this path")
+    args = parser.parse_args()
+
     SessionLocal = get_sessionmaker()
     session = SessionLocal()
 
     Base.metadata.create_all(bind=session.get_bind())
 
-    try:
-        load_data("data_parser/data.csv", session)
-    finally:
-        session.close()
\ No newline at end of file
+    filenames = expand_paths(args.paths)
+    countries, primaries, branches = load_files(filenames, session, args.workers, args.batch_size)
+    print(f"[PARSER] Loaded {len(filenames)} file(s): {countries} countries, {primaries} headquarters, {branches} branches")
+
+    if args.snapshot:
+        with SessionLocal() as session:
+            export_snapshot(session, args.snapshot)
+        print(f"[PARSER] Wrote directory snapshot to {args.snapshot}")
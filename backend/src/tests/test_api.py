@@ -1,11 +1,23 @@
 import pytest
 import tempfile
 import os
-
-from bank_api.models import Country, PrimaryBank, BranchBank, Base
-from bank_api.main import app
+import gzip
+import time
+
+from bank_api.models import Country, PrimaryBank, BranchBank, Base, Change, ChangeVersion
+import bank_api.main as main_mod
+from bank_api.main import app, create_app, create_banks
+from flask import abort
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from concurrent.futures import ThreadPoolExecutor
 from tests.testdb import get_engine, get_sessionmaker
-from data_parser.parser import load_data
+from data_parser.parser import load_data, load_files
+from bank_api.snapshot import export_snapshot
+from bank_api.compression import compressed_cache
+from bank_api.admission import AdmissionLimiter
+from bank_api.group_commit import GroupCommitter
+from bank_api.profiling import _profile_lock
 
 @pytest.fixture(scope="function")
 def empty_db_session():
@@ -91,6 +103,34 @@ def test_parser_creates_entities(empty_db_session):
     assert empty_db_session.query(PrimaryBank).count() == 2
     assert empty_db_session.query(BranchBank).count() == 2
 
+def test_parser_loads_multiple_files(empty_db_session, tmp_path):
+    # Two region files with an overlapping SWIFT code, parsed in a process pool
+    first = tmp_path / "europe.csv"
+    first.write_text("""SWIFT CODE,NAME,ADDRESS,COUNTRY ISO2 CODE,COUNTRY NAME
+        aaaabbccxxx,Primary A,Address A,pl,Poland
+        AAAABBCC123,Branch A,Address C,PL,Poland
+        INVALID,Broken,Address,PL,Poland
+        """)
+    second = tmp_path / "america.csv"
+    second.write_text("""SWIFT CODE,NAME,ADDRESS,COUNTRY ISO2 CODE,COUNTRY NAME
+        AAAABBCCXXX,Duplicate A,Address Z,PL,Poland
+        DDDDUSFFXXX,Primary D,Address D,US,United States
+        """)
+
+    inserted = load_files([str(first), str(second)], session=empty_db_session, workers=2)
+    assert inserted == (2, 2, 1)
+
+    assert empty_db_session.query(Country).count() == 2
+    assert empty_db_session.query(PrimaryBank).count() == 2
+    assert empty_db_session.query(BranchBank).count() == 1
+
+    primary_bank = empty_db_session.query(PrimaryBank).filter_by(swiftCode="AAAABBCC").one()
+    assert primary_bank.bank_name == "Primary A"
+    assert primary_bank.countryISO2 == "PL"
+
+    # Loading the same files again does not insert anything
+    assert load_files([str(first), str(second)], session=empty_db_session) == (0, 0, 0)
+
 def test_load_data_creates_entities(populated_db_session):
     # Check that the data was loaded correctly
     assert populated_db_session.query(Country).count() == 3
@@ -405,4 +445,404 @@ def test_delete_non_existing_bank(client, populated_db_session):
     resp = client.delete("/v1/swift-codes/00000000000")
     assert resp.status_code == 404
     data = resp.get_json()
-    assert data["error"] == "Bank not found"
\ No newline at end of file
+    assert data["error"] == "Bank not found"
+
+def test_delete_headquarter_deletes_branches(client, populated_db_session):
+    resp = client.delete("/v1/swift-codes/aaaabbccxxx")
+    assert resp.status_code == 200
+
+    populated_db_session.expire_all()
+    assert populated_db_session.query(PrimaryBank).filter_by(swiftCode="AAAABBCC").first() is None
+    assert populated_db_session.query(BranchBank).filter_by(swiftCode="AAAABBCC").first() is None
+    # other banks are untouched
+    assert populated_db_session.query(PrimaryBank).count() == 2
+    assert populated_db_session.query(BranchBank).count() == 1
+
+def test_delete_invalid_swift_code(client, populated_db_session):
+    resp = client.delete("/v1/swift-codes/123")
+    assert resp.status_code == 400
+
+def test_bulk_delete_codes(client, populated_db_session):
+    resp = client.delete("/v1/swift-codes", json={"swiftCodes": ["AABBCCDDXXX", "DDDDEEFF456", "00000000000"]})
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["deletedHeadquarters"] == 1
+    assert data["deletedBranches"] == 1
+
+    populated_db_session.expire_all()
+    assert populated_db_session.query(PrimaryBank).count() == 2
+    assert populated_db_session.query(BranchBank).count() == 1
+
+    resp = client.delete("/v1/swift-codes", json={"swiftCodes": ["AABBCCDDXXX", 123]})
+    assert resp.status_code == 400
+    resp = client.delete("/v1/swift-codes", json={"swiftCodes": []})
+    assert resp.status_code == 400
+
+def test_delete_country_codes(client, populated_db_session):
+    resp = client.delete("/v1/swift-codes/country/PL")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["deletedHeadquarters"] == 2
+    assert data["deletedBranches"] == 1
+
+    resp = client.get("/v1/swift-codes/country/PL")
+    assert resp.status_code == 404
+    assert client.get("/v1/swift-codes/DDDDEEFFXXX").status_code == 200
+
+    resp = client.delete("/v1/swift-codes/country/ZZ")
+    assert resp.status_code == 404
+
+def test_server_timing_opt_in_header(client, populated_db_session):
+    resp = client.get("/v1/swift-codes/AAAABBCCXXX")
+    assert "Server-Timing" not in resp.headers
+
+    app.config["SERVER_TIMING_HEADER"] = True
+    try:
+        resp = client.get("/v1/swift-codes/AAAABBCCXXX", headers={"X-Server-Timing": "1"})
+    finally:
+        app.config["SERVER_TIMING_HEADER"] = False
+    assert resp.status_code == 200
+    assert resp.get_json()["swiftCode"] == "AAAABBCCXXX"
+
+    timing = resp.headers["Server-Timing"]
+    for metric in ("validation;dur=", "db;dur=", "serialization;dur=", "total;dur="):
+        assert metric in timing
+    assert '"3 statements"' in timing
+
+def test_server_timing_counts_failed_statements(client, populated_db_session, monkeypatch):
+    def failing_directory():
+        with main_mod.SessionLocal() as session:
+            with pytest.raises(OperationalError):
+                session.execute(text("SELECT * FROM missing_table"))
+            info = session.connection().info
+            assert not info.get("_query_start")
+        abort(503)
+
+    monkeypatch.setattr(main_mod, "open_directory", failing_directory)
+    app.config["SERVER_TIMING"] = True
+    try:
+        resp = client.get("/v1/swift-codes/AAAABBCCXXX")
+    finally:
+        app.config["SERVER_TIMING"] = False
+    assert resp.status_code == 503
+    assert '"1 statements"' in resp.headers["Server-Timing"]
+
+def test_profile_dump(client, populated_db_session, tmp_path):
+    app.config["PROFILE_DIR"] = str(tmp_path)
+    try:
+        resp = client.get("/v1/swift-codes/country/PL", headers={"X-Profile": "1"})
+    finally:
+        app.config["PROFILE_DIR"] = None
+    assert resp.status_code == 200
+    assert "Server-Timing" not in resp.headers
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+
+def test_profile_skipped_while_another_request_is_profiled(client, populated_db_session, tmp_path):
+    app.config["PROFILE_DIR"] = str(tmp_path)
+    try:
+        with _profile_lock:
+            resp = client.get("/v1/swift-codes/country/PL", headers={"X-Profile": "1"})
+        assert resp.status_code == 200
+        assert not list(tmp_path.glob("*.prof"))
+
+        for _ in range(2):
+            assert client.get("/v1/swift-codes/country/PL", headers={"X-Profile": "1"}).status_code == 200
+    finally:
+        app.config["PROFILE_DIR"] = None
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+
+def test_snapshot_serves_same_responses(client, populated_db_session, tmp_path):
+    urls = [
+        "/v1/swift-codes/AAAABBCCXXX",
+        "/v1/swift-codes/AABBCCDDXXX",
+        "/v1/swift-codes/AAAABBCC123",
+        "/v1/swift-codes/00000000000",
+        "/v1/swift-codes/country/PL",
+        "/v1/swift-codes/country/DE",
+        "/v1/swift-codes/country/US",
+        "/v1/swift-codes/country/ZZ",
+        "/v1/swift-codes/ÄAAABBCCXXX",
+        "/v1/swift-codes/AAAABBCCÄÖÜ",
+        "/v1/swift-codes/country/ÄÖ",
+    ]
+    expected = [(resp.status_code, resp.get_json()) for resp in map(client.get, urls)]
+
+    snapshot_path = tmp_path / "directory.snap"
+    export_snapshot(populated_db_session, str(snapshot_path))
+    # rows deleted after the export are still served from the snapshot
+    populated_db_session.query(BranchBank).delete()
+    populated_db_session.query(PrimaryBank).delete()
+    populated_db_session.commit()
+
+    app.config["SNAPSHOT_PATH"] = str(snapshot_path)
+    try:
+        actual = [(resp.status_code, resp.get_json()) for resp in map(client.get, urls)]
+    finally:
+        app.config["SNAPSHOT_PATH"] = None
+    assert actual == expected
+
+def test_compressed_country_listing(client, populated_db_session):
+    plain = client.get("/v1/swift-codes/country/PL")
+    assert "Content-Encoding" not in plain.headers
+
+    app.config["COMPRESS_MIN_SIZE"] = 0
+    compressed_cache.clear()
+    try:
+        resp = client.get("/v1/swift-codes/country/PL", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in resp.headers["Vary"]
+        assert gzip.decompress(resp.data) == plain.data
+        assert len(compressed_cache) == 1
+
+        # served from the cache until a write clears it
+        cached = client.get("/v1/swift-codes/country/PL", headers={"Accept-Encoding": "gzip"})
+        assert cached.data == resp.data
+
+        client.delete("/v1/swift-codes/AABBCCDDXXX")
+        assert len(compressed_cache) == 0
+        resp = client.get("/v1/swift-codes/country/PL", headers={"Accept-Encoding": "gzip"})
+        assert b"AABBCCDDXXX" not in gzip.decompress(resp.data)
+
+        # clients that refuse compression get the plain body
+        resp = client.get("/v1/swift-codes/country/PL", headers={"Accept-Encoding": "gzip;q=0"})
+        assert "Content-Encoding" not in resp.headers
+    finally:
+        app.config["COMPRESS_MIN_SIZE"] = 1024
+        compressed_cache.clear()
+
+def test_create_app_warms_up(populated_db_session):
+    engine = populated_db_session.get_bind()
+    app.config["WARM_COUNTRIES"] = ["PL"]
+    app.config["COMPRESS_MIN_SIZE"] = 0
+    compressed_cache.clear()
+    try:
+        warm_app = create_app(engine)
+        assert len(compressed_cache) > 0
+        assert engine.pool.checkedin() >= app.config["DB_WARM_CONNECTIONS"]
+    finally:
+        app.config["WARM_COUNTRIES"] = []
+        app.config["COMPRESS_MIN_SIZE"] = 1024
+        compressed_cache.clear()
+
+    client = warm_app.test_client()
+    assert client.get("/healthz").status_code == 200
+    resp = client.get("/readyz")
+    assert resp.status_code == 200
+    assert resp.get_json()["status"] == "ready"
+
+def test_failed_warm_up_is_not_ready(populated_db_session, monkeypatch):
+    def broken_directory():
+        abort(500)
+
+    engine = populated_db_session.get_bind()
+    monkeypatch.setattr(main_mod, "open_directory", broken_directory)
+    warm_app = create_app(engine)
+    client = warm_app.test_client()
+    assert client.get("/readyz").status_code == 503
+
+    monkeypatch.undo()
+    assert client.get("/readyz").status_code == 200
+
+def test_readyz_warm_up_keeps_request_timings(client, populated_db_session, tmp_path):
+    main_mod._ready.clear()
+    app.config["SERVER_TIMING"] = True
+    app.config["PROFILE_DIR"] = str(tmp_path)
+    try:
+        resp = client.get("/readyz", headers={"X-Profile": "1"})
+    finally:
+        app.config["SERVER_TIMING"] = False
+        app.config["PROFILE_DIR"] = None
+    assert resp.status_code == 200
+    assert "Server-Timing" in resp.headers
+    assert not _profile_lock.locked()
+    assert len(list(tmp_path.glob("*readyz*.prof"))) == 1
+
+def test_changes_feed(client, empty_db_session):
+    resp = client.get("/v1/changes")
+    assert resp.status_code == 200
+    assert resp.get_json()["changes"] == []
+    assert resp.get_json()["latestVersion"] == 0
+
+    new_bank = {
+        "address": "New Address",
+        "bankName": "New Bank",
+        "countryISO2": "PL",
+        "countryName": "Poland",
+        "isHeadquarter": True,
+        "swiftCode": "ZZZZZZZZXXX",
+    }
+    assert client.post("/v1/swift-codes", json=new_bank).status_code == 201
+    assert client.post("/v1/swift-codes", json=dict(new_bank, isHeadquarter=False, swiftCode="ZZZZZZZZ001")).status_code == 201
+    assert client.delete("/v1/swift-codes/ZZZZZZZZXXX").status_code == 200
+
+    data = client.get("/v1/changes?since=0").get_json()
+    assert [(c["version"], c["operation"], c["swiftCode"]) for c in data["changes"]] == [
+        (1, "upsert", "ZZZZZZZZXXX"),
+        (2, "upsert", "ZZZZZZZZ001"),
+        (3, "delete", "ZZZZZZZZ001"),
+        (4, "delete", "ZZZZZZZZXXX"),
+    ]
+    assert data["changes"][0]["bank"]["countryName"] == "Poland"
+    assert data["changes"][3]["bank"] is None
+    assert data["latestVersion"] == 4
+
+    data = client.get("/v1/changes?since=2&limit=1").get_json()
+    assert [c["version"] for c in data["changes"]] == [3]
+    assert data["nextSince"] == 3
+    assert data["hasMore"] is True
+
+    assert client.get("/v1/changes?since=-1").status_code == 400
+    assert client.get("/v1/changes?limit=0").status_code == 400
+    assert client.get("/v1/changes?since=%C2%B2").status_code == 400
+    assert client.get("/v1/changes?limit=%C2%B2").status_code == 400
+    assert client.get("/v1/changes?since=99999999999999999999999").status_code == 400
+    assert client.get(f"/v1/changes?since={2**63 - 1}").status_code == 200
+    assert client.get("/v1/changes", headers={"Last-Event-ID": "99999999999999999999999"}).status_code == 400
+    assert client.get("/v1/changes/stream", headers={"Last-Event-ID": "99999999999999999999999"}).status_code == 400
+
+    resp = client.get("/v1/changes/stream", headers={"Last-Event-ID": "3"}, buffered=False)
+    assert resp.mimetype == "text/event-stream"
+    event = next(iter(resp.response))
+    resp.close()
+    assert event.startswith(b"id: 4\nevent: change\ndata: ")
+
+    # a reconnect keeps the original URL, Last-Event-ID must win over its `since`
+    resp = client.get("/v1/changes/stream?since=0", headers={"Last-Event-ID": "2"}, buffered=False)
+    event = next(iter(resp.response))
+    resp.close()
+    assert event.startswith(b"id: 3\nevent: change\ndata: ")
+
+def test_parser_records_changes(empty_db_session):
+    csv_content = """SWIFT CODE,NAME,ADDRESS,COUNTRY ISO2 CODE,COUNTRY NAME
+        AAAABBCCXXX,Primary A,Address A,PL,Poland
+        AAAABBCC123,Branch A,Address C,PL,Poland
+        """
+    with tempfile.NamedTemporaryFile(mode='w+', delete=False, newline='') as tmp:
+        tmp.write(csv_content)
+    load_data(tmp.name, session=empty_db_session)
+    os.unlink(tmp.name)
+
+    assert empty_db_session.query(Change).count() == 2
+    assert empty_db_session.query(ChangeVersion).one().version == 2
+
+def test_create_banks_resolves_in_order(populated_db_session):
+    def bank(swift_code, country_name="Poland"):
+        return {"address": "A", "bankName": "B", "countryISO2": "PL", "countryName": country_name, "swiftCode": swift_code}
+
+    results = create_banks(populated_db_session, [
+        bank("ZZZZZZZZXXX"),
+        bank("ZZZZZZZZXXX"),
+        bank("AAAABBCC123"),
+        bank("ZZZZZZZZ001"),
+        bank("YYYYYYYYXXX", country_name="Polska"),
+    ])
+    populated_db_session.commit()
+    assert [status for _, status in results] == [201, 409, 409, 201, 409]
+    assert results[4][0]["error"] == "Country name mismatch"
+    assert populated_db_session.query(PrimaryBank).filter_by(swiftCode="ZZZZZZZZ").count() == 1
+    assert populated_db_session.query(BranchBank).filter_by(swiftCode="ZZZZZZZZ").count() == 1
+
+def test_group_commit(empty_db_session):
+    new_bank = {
+        "address": "New Address",
+        "bankName": "New Bank",
+        "countryISO2": "PL",
+        "countryName": "Poland",
+        "isHeadquarter": True,
+    }
+    swift_codes = [f"ZZZZZZ{i:02d}XXX" for i in range(8)] + ["ZZZZZZ00XXX"]
+
+    def post(swift_code):
+        with app.test_client() as client:
+            return client.post("/v1/swift-codes", json=dict(new_bank, swiftCode=swift_code)).status_code
+
+    app.config["GROUP_COMMIT_WINDOW_MS"] = 50
+    try:
+        with ThreadPoolExecutor(max_workers=len(swift_codes)) as pool:
+            statuses = list(pool.map(post, swift_codes))
+    finally:
+        app.config["GROUP_COMMIT_WINDOW_MS"] = 0
+
+    assert sorted(statuses) == [201] * 8 + [409]
+    assert empty_db_session.query(PrimaryBank).count() == 8
+    assert empty_db_session.query(Country).count() == 1
+    assert empty_db_session.query(Change).count() == 8
+
+def test_group_commit_timeout(client, empty_db_session):
+    new_bank = {
+        "address": "New Address",
+        "bankName": "New Bank",
+        "countryISO2": "PL",
+        "countryName": "Poland",
+        "isHeadquarter": True,
+        "swiftCode": "ZZZZZZZZXXX",
+    }
+    app.config["GROUP_COMMIT_WINDOW_MS"] = 50
+    app.config["GROUP_COMMIT_TIMEOUT"] = 0.001
+    try:
+        resp = client.post("/v1/swift-codes", json=new_bank)
+    finally:
+        app.config["GROUP_COMMIT_WINDOW_MS"] = 0
+        app.config["GROUP_COMMIT_TIMEOUT"] = 30
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == str(app.config["ADMISSION_RETRY_AFTER"])
+
+    # the queued write still lands
+    for _ in range(100):
+        if client.get("/v1/swift-codes/ZZZZZZZZXXX").status_code == 200:
+            break
+        time.sleep(0.01)
+    assert client.get("/v1/swift-codes/ZZZZZZZZXXX").status_code == 200
+
+def test_group_commit_on_commit_failure_does_not_retry(empty_db_session):
+    batches = []
+
+    def resolve(session, items):
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    def on_commit():
+        raise RuntimeError("receiver failed")
+
+    committer = GroupCommitter(main_mod.SessionLocal, resolve, window=0.05, max_batch=10, on_commit=on_commit)
+    futures = [committer.submit(i) for i in range(3)]
+    assert [future.result(timeout=5) for future in futures] == [0, 2, 4]
+    assert batches == [[0, 1, 2]]
+
+def test_admission_limiter_queue():
+    limiter = AdmissionLimiter(limit=1, queue_size=1, queue_timeout=0.05)
+    assert limiter.acquire()
+
+    # one request may wait in the queue and times out, the queue is empty again afterwards
+    assert not limiter.acquire()
+    assert limiter.waiting == 0
+
+    limiter.queue_size = 0
+    assert not limiter.acquire()
+
+    limiter.release()
+    assert limiter.acquire()
+    assert limiter.active == 1
+
+def test_admission_sheds_load(client, populated_db_session):
+    app.config.update(ADMISSION_READ_LIMIT=1, ADMISSION_QUEUE_SIZE=0)
+    try:
+        assert client.get("/v1/swift-codes/AAAABBCCXXX").status_code == 200
+        limiter = app.extensions["admission_limiters"]["read"]
+        assert limiter.active == 0
+
+        # occupy the only read slot
+        assert limiter.acquire()
+        resp = client.get("/v1/swift-codes/AAAABBCCXXX")
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "1"
+
+        # writes, probes and the limit of the other class are not affected
+        assert client.get("/healthz").status_code == 200
+        assert client.delete("/v1/swift-codes/AABBCCDDXXX").status_code == 200
+
+        limiter.release()
+        assert client.get("/v1/swift-codes/AAAABBCCXXX").status_code == 200
+    finally:
+        app.config.update(ADMISSION_READ_LIMIT=0, ADMISSION_QUEUE_SIZE=16)